@@ -1,10 +1,15 @@
 import csv
+from glob import glob
 import shutil
 import sys
 import time
 from pathlib import Path
 
 from hash_all import hash_all
+from hash_parallel import hash_file
+
+MANIFEST_HEADER = ["filename", "hash"]
+STAT_HEADER = ["filename", "hash", "size", "mtime", "inode"]
 
 
 # mccole:backup
@@ -31,17 +36,58 @@ def current_time():
 # mccole:/time
 
 # mccole:write
-def write_manifest(backup_dir, timestamp, manifest):
+def write_manifest(backup_dir, timestamp, manifest, header=MANIFEST_HEADER):
     backup_dir = Path(backup_dir)
     if not backup_dir.exists():
         backup_dir.mkdir()
     manifest_file = Path(backup_dir, f"{timestamp}.csv")
     with open(manifest_file, "w") as raw:
         writer = csv.writer(raw)
-        writer.writerow(["filename", "hash"])
+        writer.writerow(header)
         writer.writerows(manifest)
 # mccole:/write
 
+def backup_incremental(source_dir, backup_dir):
+    previous = read_previous(backup_dir)
+    full = []
+    for name in glob("**/*.*", root_dir=source_dir, recursive=True):
+        source_path = Path(source_dir, name)
+        info = source_path.stat()
+        stamp = (info.st_size, info.st_mtime_ns, info.st_ino)
+        if (name in previous) and (previous[name][1] == stamp):
+            hash_code = previous[name][0]
+        else:
+            hash_code = hash_file(source_path)
+        full.append((name, hash_code, *stamp))
+    timestamp = current_time()
+    write_manifest(backup_dir, timestamp, full, STAT_HEADER)
+    manifest = [(name, hash_code) for (name, hash_code, *_) in full]
+    copy_files(source_dir, backup_dir, manifest)
+    return manifest
+
+def read_previous(backup_dir):
+    manifests = [
+        p for p in Path(backup_dir).glob("*.csv") if p.stem.isdigit()
+    ]
+    if not manifests:
+        return {}
+    latest = max(manifests, key=lambda p: int(p.stem))
+    with open(latest, "r") as raw:
+        reader = csv.DictReader(raw)
+        if reader.fieldnames != STAT_HEADER:
+            return {}
+        return {
+            row["filename"]: (
+                row["hash"],
+                (int(row["size"]), int(row["mtime"]), int(row["inode"]))
+            )
+            for row in reader
+        }
+
 if __name__ == "__main__":
-    assert len(sys.argv) == 3, "Usage: backup.py source_dir backup_dir"
-    backup(sys.argv[1], sys.argv[2])
+    if (len(sys.argv) == 4) and (sys.argv[1] == "--incremental"):
+        backup_incremental(sys.argv[2], sys.argv[3])
+    else:
+        assert len(sys.argv) == 3, \
+            "Usage: backup.py [--incremental] source_dir backup_dir"
+        backup(sys.argv[1], sys.argv[2])
@@ -1,10 +1,14 @@
 import csv
+from glob import glob
 import shutil
 import sys
 import time
 from pathlib import Path
 
-from hash_all import hash_all
+from hashlib import sha256
+
+from chunking import chunk_stream
+from hash_all import hash_all, HASH_LEN
 
 # mccole:base
 class Archive:
@@ -20,6 +24,8 @@ class Archive:
 
 
 class ArchiveLocal(Archive):
+    MANIFEST_HEADER = ("filename", "hash")
+
     def __init__(self, source_dir, backup_dir):
         super().__init__(source_dir)
         self._backup_dir = backup_dir
@@ -39,12 +45,61 @@ class ArchiveLocal(Archive):
         manifest_file = Path(backup_dir, f"{t}.csv")
         with open(manifest_file, "w") as raw:
             writer = csv.writer(raw)
-            writer.writerow(["filename", "hash"])
+            writer.writerow(self.MANIFEST_HEADER)
             writer.writerows(manifest)
 
     def _timestamp(self):
         return f"{time.time()}".split(".")[0]
 
+
+class ArchiveChunked(ArchiveLocal):
+    MANIFEST_HEADER = ("filename", "hash", "chunks")
+
+    def backup(self):
+        # Hash each file while chunking it so that it is only read once.
+        names = glob("**/*.*", root_dir=self._source_dir, recursive=True)
+        chunked = self._copy_files(names)
+        self._write_manifest(chunked)
+        return [(filename, hash_code) for (filename, hash_code, _) in chunked]
+
+    def restore(self, timestamp, target_dir):
+        manifest_file = Path(self._backup_dir, f"{timestamp}.csv")
+        with open(manifest_file, "r") as raw:
+            reader = csv.reader(raw)
+            next(reader)
+            for (filename, hash_code, chunks) in reader:
+                target_path = Path(target_dir, filename)
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(target_path, "wb") as writer:
+                    for chunk_code in chunks.split():
+                        chunk_path = self._make_chunk_path(chunk_code)
+                        writer.write(chunk_path.read_bytes())
+
+    def _copy_files(self, names):
+        Path(self._backup_dir).mkdir(parents=True, exist_ok=True)
+        result = []
+        for filename in names:
+            source_path = Path(self._source_dir, filename)
+            file_hash = sha256()
+            codes = []
+            with open(source_path, "rb") as reader:
+                for chunk in chunk_stream(reader):
+                    file_hash.update(chunk)
+                    codes.append(self._store_chunk(chunk))
+            hash_code = file_hash.hexdigest()[:HASH_LEN]
+            result.append((filename, hash_code, " ".join(codes)))
+        return result
+
+    def _store_chunk(self, chunk):
+        chunk_code = sha256(chunk).hexdigest()[:HASH_LEN]
+        chunk_path = self._make_chunk_path(chunk_code)
+        if not chunk_path.exists():
+            chunk_path.write_bytes(chunk)
+        return chunk_code
+
+    def _make_chunk_path(self, chunk_code):
+        return Path(self._backup_dir, f"{chunk_code}.chk")
+
 def read_data(options):
     pass
 
@@ -0,0 +1,183 @@
+import csv
+import lzma
+import os
+import sys
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+from backup_oop import ArchiveLocal
+
+BUFFER_SIZE = 1024 * 1024  # how much data to read at once
+
+PackEntry = namedtuple(
+    "PackEntry", ["hash_code", "pack", "offset", "length", "codec"]
+)
+
+class Uncompressed:
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b""
+
+COMPRESSORS = {
+    "none": Uncompressed,
+    "zlib": zlib.compressobj,
+    "lzma": lzma.LZMACompressor,
+}
+
+DECOMPRESSORS = {
+    "none": bytes,
+    "zlib": zlib.decompress,
+    "lzma": lzma.decompress,
+}
+
+
+class ArchivePacked(ArchiveLocal):
+    PACK_SIZE = 256 * 1024 * 1024
+    PACK_SUFFIX = "pack"
+    INDEX_FILE = "packs.idx"
+
+    def __init__(self, source_dir, backup_dir,
+                 codec="none", pack_size=PACK_SIZE):
+        super().__init__(source_dir, backup_dir)
+        assert codec in COMPRESSORS, f"Unknown codec {codec}"
+        self._codec = codec
+        self._pack_size = pack_size
+        self._index = None
+
+    def fetch(self, hash_code):
+        index = self._get_index()
+        if hash_code not in index:
+            raise KeyError(f"Unknown object {hash_code}")
+        entry = index[hash_code]
+        return DECOMPRESSORS[entry.codec](self._read_raw(entry))
+
+    def restore(self, timestamp, target_dir):
+        manifest_file = Path(self._backup_dir, f"{timestamp}.csv")
+        with open(manifest_file, "r") as raw:
+            reader = csv.reader(raw)
+            next(reader)
+            for (filename, hash_code) in reader:
+                target_path = Path(target_dir, filename)
+                target_path.parent.mkdir(parents=True, exist_ok=True)
+                target_path.write_bytes(self.fetch(hash_code))
+
+    def compact(self):
+        live = self._referenced()
+        index = self._get_index()
+        old_packs = self._pack_nums()
+        first = (old_packs[-1] + 1) if old_packs else 0
+        new_index = {}
+        for hash_code in sorted(live & set(index)):
+            entry = index[hash_code]
+            raw = self._read_raw(entry)
+            new_index[hash_code] = self._write_object(
+                hash_code, [raw], entry.codec, first
+            )
+        self._save_index(new_index)
+        for num in old_packs:
+            self._make_pack_path(num).unlink()
+        self._index = new_index
+        return len(index) - len(new_index)
+
+    def _copy_files(self, manifest):
+        Path(self._backup_dir).mkdir(parents=True, exist_ok=True)
+        index = self._get_index()
+        for (filename, hash_code) in manifest:
+            if hash_code in index:
+                continue
+            source_path = Path(self._source_dir, filename)
+            blocks = self._compress(source_path)
+            entry = self._write_object(hash_code, blocks, self._codec)
+            self._append_index(entry)
+
+    def _compress(self, source_path):
+        compressor = COMPRESSORS[self._codec]()
+        with open(source_path, "rb") as reader:
+            while True:
+                block = reader.read(BUFFER_SIZE)
+                if not block:
+                    break
+                yield compressor.compress(block)
+        yield compressor.flush()
+
+    def _write_object(self, hash_code, blocks, codec, first=0):
+        pack = self._current_pack(first)
+        with open(self._make_pack_path(pack), "ab") as writer:
+            offset = writer.seek(0, os.SEEK_END)
+            writer.writelines(blocks)
+            length = writer.tell() - offset
+        return PackEntry(hash_code, pack, offset, length, codec)
+
+    def _read_raw(self, entry):
+        with open(self._make_pack_path(entry.pack), "rb") as reader:
+            reader.seek(entry.offset)
+            return reader.read(entry.length)
+
+    def _current_pack(self, first):
+        packs = [num for num in self._pack_nums() if num >= first]
+        if not packs:
+            return first
+        last = packs[-1]
+        if self._make_pack_path(last).stat().st_size >= self._pack_size:
+            return last + 1
+        return last
+
+    def _pack_nums(self):
+        paths = Path(self._backup_dir).glob(f"*.{self.PACK_SUFFIX}")
+        return sorted(int(p.stem) for p in paths)
+
+    def _make_pack_path(self, num):
+        return Path(self._backup_dir, f"{num:06}.{self.PACK_SUFFIX}")
+
+    def _referenced(self):
+        result = set()
+        for manifest_file in Path(self._backup_dir).glob("*.csv"):
+            with open(manifest_file, "r") as raw:
+                reader = csv.reader(raw)
+                next(reader)
+                result |= {row[1] for row in reader}
+        return result
+
+    def _get_index(self):
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self):
+        index_path = self._make_index_path()
+        if not index_path.exists():
+            return {}
+        with open(index_path, "r") as stream:
+            entries = [
+                PackEntry(r[0], int(r[1]), int(r[2]), int(r[3]), r[4])
+                for r in csv.reader(stream)
+            ]
+        return {e.hash_code: e for e in entries}
+
+    def _append_index(self, entry):
+        with open(self._make_index_path(), "a") as stream:
+            csv.writer(stream).writerow(entry)
+        self._index[entry.hash_code] = entry
+
+    def _save_index(self, index):
+        index_path = self._make_index_path()
+        temp_path = index_path.with_suffix(".tmp")
+        with open(temp_path, "w") as stream:
+            csv.writer(stream).writerows(index.values())
+        temp_path.replace(index_path)
+
+    def _make_index_path(self):
+        return Path(self._backup_dir, self.INDEX_FILE)
+
+if __name__ == "__main__":
+    if (len(sys.argv) == 3) and (sys.argv[1] == "--compact"):
+        archiver = ArchivePacked(None, sys.argv[2])
+        print(f"dropped {archiver.compact()} objects")
+    else:
+        assert len(sys.argv) in (3, 4), \
+            "Usage: backup_packed.py source_dir backup_dir [codec]"
+        codec = sys.argv[3] if len(sys.argv) == 4 else "none"
+        ArchivePacked(sys.argv[1], sys.argv[2], codec).backup()
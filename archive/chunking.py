@@ -0,0 +1,51 @@
+import random
+import sys
+
+BUFFER_SIZE = 1024 * 1024  # how much data to read at once
+MIN_CHUNK = 2 * 1024       # never cut before this many bytes
+MAX_CHUNK = 64 * 1024      # always cut after this many bytes
+BOUNDARY_BITS = 13         # average chunk is about 2**13 bytes past MIN_CHUNK
+WINDOW = 64                # number of bytes that affect the rolling hash
+HASH_MASK = (1 << WINDOW) - 1
+# Each shift pushes older bytes towards the top of the hash, so the low
+# bits only depend on the last few bytes: test the high bits instead so
+# that the whole window decides where chunks end.
+BOUNDARY_MASK = ((1 << BOUNDARY_BITS) - 1) << (WINDOW - BOUNDARY_BITS)
+
+# One random 64-bit value per byte value, fixed so that chunk boundaries
+# are the same from one run to the next.
+GEAR = [random.Random(20230101 + i).getrandbits(64) for i in range(256)]
+
+def find_boundary(data, start, final):
+    limit = min(len(data), start + MAX_CHUNK)
+    h = 0
+    # The hash only depends on the last WINDOW bytes, so there is no
+    # point hashing the bytes before that at the start of a chunk.
+    for i in range(start + MIN_CHUNK - WINDOW, limit):
+        h = ((h << 1) + GEAR[data[i]]) & HASH_MASK
+        if (i + 1 - start >= MIN_CHUNK) and ((h & BOUNDARY_MASK) == 0):
+            return i + 1
+    if (limit - start == MAX_CHUNK) or (final and limit > start):
+        return limit
+    return None
+
+def chunk_stream(reader):
+    pending = b""
+    while True:
+        block = reader.read(BUFFER_SIZE)
+        pending += block
+        start = 0
+        while True:
+            cut = find_boundary(pending, start, not block)
+            if cut is None:
+                break
+            yield pending[start:cut]
+            start = cut
+        pending = pending[start:]
+        if not block:
+            break
+
+if __name__ == "__main__":
+    with open(sys.argv[1], "rb") as reader:
+        for chunk in chunk_stream(reader):
+            print(len(chunk))
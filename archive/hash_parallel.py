@@ -0,0 +1,46 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+import os
+import sys
+from pathlib import Path
+from hashlib import sha256
+
+from hash_all import HASH_LEN
+
+BUFFER_SIZE = 1024 * 1024  # how much data to read at once
+TASKS_PER_WORKER = 4       # how many batches to give each worker
+
+def hash_file(full_name):
+    hasher = sha256()
+    with open(full_name, "rb") as reader:
+        while True:
+            block = reader.read(BUFFER_SIZE)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()[:HASH_LEN]
+
+def hash_all_parallel(root, workers=None):
+    names = glob("**/*.*", root_dir=root, recursive=True)
+    full_names = [Path(root, name) for name in names]
+    if workers == 1:
+        hash_codes = map(hash_file, full_names)
+    else:
+        workers = workers or os.cpu_count()
+        chunk = max(1, len(full_names) // (workers * TASKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hash_codes = list(
+                pool.map(hash_file, full_names, chunksize=chunk)
+            )
+    return list(zip(names, hash_codes))
+
+if __name__ == "__main__":
+    assert len(sys.argv) in (2, 3), \
+        "Usage: hash_parallel.py root [workers]"
+    root = sys.argv[1]
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else None
+    table = hash_all_parallel(root, workers)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["filename", "hash"])
+    writer.writerows(table)
@@ -0,0 +1,56 @@
+import csv
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hash_all import hash_all
+from hash_parallel import hash_all_parallel
+
+KB = 1024
+MB = 1024 * KB
+
+# name: (number of files, size of each file)
+DISTRIBUTIONS = {
+    "small": [(2000, 4 * KB)],
+    "large": [(8, 32 * MB)],
+    "mixed": [(1000, 4 * KB), (100, 256 * KB), (4, 32 * MB)],
+}
+
+def make_tree(root, spec):
+    for (i, (num, size)) in enumerate(spec):
+        subdir = Path(root, f"dir_{i}")
+        subdir.mkdir()
+        for j in range(num):
+            with open(Path(subdir, f"file_{j}.bin"), "wb") as writer:
+                writer.write(os.urandom(size))
+
+def time_hash(func, root, *args):
+    start = time.time()
+    func(root, *args)
+    return time.time() - start
+
+def sweep(names, workers):
+    result = []
+    for name in names:
+        with tempfile.TemporaryDirectory() as root:
+            make_tree(root, DISTRIBUTIONS[name])
+            times = [
+                time_hash(hash_all, root),
+                time_hash(hash_all_parallel, root, 1),
+                time_hash(hash_all_parallel, root, workers),
+            ]
+        result.append([name, workers, *times])
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["files", "workers", "original", "streamed", "parallel"])
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    names = sys.argv[2:] if len(sys.argv) > 2 else list(DISTRIBUTIONS)
+    report(sweep(names, workers))
@@ -0,0 +1,66 @@
+import csv
+import shutil
+import sys
+from pathlib import Path
+
+from hash_parallel import hash_file
+
+def list_snapshots(backup_dir):
+    manifests = Path(backup_dir).glob("*.csv")
+    return sorted((p.stem for p in manifests), key=int)
+
+def read_manifest(backup_dir, timestamp):
+    manifest_file = Path(backup_dir, f"{timestamp}.csv")
+    with open(manifest_file, "r") as raw:
+        reader = csv.reader(raw)
+        next(reader)
+        return sorted((row[0], row[1]) for row in reader)
+
+def diff_manifests(old, new):
+    added, removed, changed = [], [], []
+    i, j = 0, 0
+    while (i < len(old)) and (j < len(new)):
+        (old_name, old_hash), (new_name, new_hash) = old[i], new[j]
+        if old_name < new_name:
+            removed.append(old_name)
+            i += 1
+        elif new_name < old_name:
+            added.append(new_name)
+            j += 1
+        else:
+            if old_hash != new_hash:
+                changed.append(new_name)
+            i += 1
+            j += 1
+    removed.extend(name for (name, _) in old[i:])
+    added.extend(name for (name, _) in new[j:])
+    return added, removed, changed
+
+def diff_snapshots(backup_dir, old_timestamp, new_timestamp):
+    old = read_manifest(backup_dir, old_timestamp)
+    new = read_manifest(backup_dir, new_timestamp)
+    return diff_manifests(old, new)
+
+def restore(backup_dir, timestamp, target_dir):
+    copied = []
+    for (filename, hash_code) in read_manifest(backup_dir, timestamp):
+        target_path = Path(target_dir, filename)
+        if target_path.exists() and (hash_file(target_path) == hash_code):
+            continue
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(Path(backup_dir, f"{hash_code}.bck"), target_path)
+        copied.append(filename)
+    return copied
+
+if __name__ == "__main__":
+    if (len(sys.argv) == 5) and (sys.argv[1] == "--restore"):
+        for filename in restore(sys.argv[2], sys.argv[3], sys.argv[4]):
+            print(filename)
+    else:
+        assert len(sys.argv) == 4, \
+            "Usage: snapshot.py backup_dir old new " \
+            "| snapshot.py --restore backup_dir timestamp target_dir"
+        added, removed, changed = diff_snapshots(*sys.argv[1:])
+        for (marker, names) in (("+", added), ("-", removed), ("*", changed)):
+            for name in names:
+                print(marker, name)
@@ -2,7 +2,9 @@ from pathlib import Path
 from unittest.mock import patch
 import pytest
 
-from backup import backup
+from backup import backup, backup_incremental
+from hash_all import hash_all
+from hash_parallel import hash_file
 
 # mccole:setup
 FILES = {"a.txt": "aaa", "b.txt": "bbb", "sub_dir/c.txt": "ccc"}
@@ -22,3 +24,54 @@ def test_nested_example(our_fs):
     for filename, hash_code in manifest:
         assert Path("/backup", f"{hash_code}.bck").exists()
 # mccole:/test
+
+@pytest.fixture
+def src_fs(fs):
+    for name, contents in FILES.items():
+        fs.create_file(Path("/src", name), contents=contents)
+
+def test_incremental_first_backup_hashes_everything(src_fs):
+    with patch("backup.current_time", return_value=1234):
+        manifest = backup_incremental("/src", "/backup")
+    assert sorted(manifest) == sorted(hash_all("/src"))
+    assert Path("/backup", "1234.csv").exists()
+    for filename, hash_code in manifest:
+        assert Path("/backup", f"{hash_code}.bck").exists()
+
+def test_incremental_unchanged_files_not_rehashed(src_fs):
+    with patch("backup.current_time", return_value=1234):
+        first = backup_incremental("/src", "/backup")
+    with patch("backup.current_time", return_value=1235), \
+         patch("backup.hash_file", wraps=hash_file) as spy:
+            second = backup_incremental("/src", "/backup")
+    assert spy.call_count == 0
+    assert sorted(first) == sorted(second)
+
+def test_incremental_changed_files_rehashed(src_fs):
+    with patch("backup.current_time", return_value=1234):
+        backup_incremental("/src", "/backup")
+    with open("/src/a.txt", "w") as writer:
+        writer.write("new content for a.txt")
+    Path("/src/d.txt").write_text("ddd")
+    with patch("backup.current_time", return_value=1235), \
+         patch("backup.hash_file", wraps=hash_file) as spy:
+            manifest = backup_incremental("/src", "/backup")
+    assert {c.args[0].name for c in spy.call_args_list} == {"a.txt", "d.txt"}
+    assert sorted(manifest) == sorted(hash_all("/src"))
+
+def test_incremental_ignores_manifest_without_stat(src_fs):
+    with patch("backup.current_time", return_value=1234):
+        backup("/src", "/backup")
+    with patch("backup.current_time", return_value=1235), \
+         patch("backup.hash_file", wraps=hash_file) as spy:
+            backup_incremental("/src", "/backup")
+    assert spy.call_count == len(FILES)
+
+def test_incremental_ignores_non_numeric_csv(src_fs):
+    with patch("backup.current_time", return_value=1234):
+        backup_incremental("/src", "/backup")
+    Path("/backup/notes.csv").write_text("filename,hash\n")
+    with patch("backup.current_time", return_value=1235), \
+         patch("backup.hash_file", wraps=hash_file) as spy:
+            backup_incremental("/src", "/backup")
+    assert spy.call_count == 0
@@ -0,0 +1,79 @@
+from pathlib import Path
+import random
+from unittest.mock import patch
+import pytest
+
+from backup_oop import ArchiveChunked, ArchiveLocal
+from chunking import MAX_CHUNK, WINDOW, chunk_stream, find_boundary
+from hash_all import hash_all
+
+FILES = {"a.txt": "aaa", "b.txt": "bbb", "sub_dir/c.txt": "ccc"}
+
+@pytest.fixture
+def our_fs(fs):
+    for name, contents in FILES.items():
+        fs.create_file(Path("/src", name), contents=contents)
+    return fs
+
+def make_archive(cls):
+    return cls("/src", "/backup")
+
+def test_local_backup(our_fs):
+    archive = make_archive(ArchiveLocal)
+    with patch.object(ArchiveLocal, "_timestamp", return_value="1234"):
+        manifest = archive.backup()
+    assert Path("/backup", "1234.csv").exists()
+    for filename, hash_code in manifest:
+        assert Path("/backup", f"{hash_code}.bck").exists()
+
+def test_chunked_backup_then_restore(our_fs):
+    archive = make_archive(ArchiveChunked)
+    with patch.object(ArchiveChunked, "_timestamp", return_value="1234"):
+        archive.backup()
+    archive.restore("1234", "/restored")
+    for name, contents in FILES.items():
+        assert Path("/restored", name).read_text() == contents
+
+def test_chunked_identical_content_stored_once(our_fs):
+    our_fs.create_file("/src/copy_of_a.txt", contents=FILES["a.txt"])
+    archive = make_archive(ArchiveChunked)
+    with patch.object(ArchiveChunked, "_timestamp", return_value="1234"):
+        archive.backup()
+    assert len(list(Path("/backup").glob("*.chk"))) == len(FILES)
+
+def test_chunked_append_reuses_chunks(our_fs):
+    data = random.Random(1).randbytes(8 * MAX_CHUNK)
+    our_fs.create_file("/src/big.bin", contents=data)
+    archive = make_archive(ArchiveChunked)
+    with patch.object(ArchiveChunked, "_timestamp", return_value="1234"):
+        archive.backup()
+    before = len(list(Path("/backup").glob("*.chk")))
+
+    with open("/src/big.bin", "ab") as writer:
+        writer.write(b"appended")
+    with patch.object(ArchiveChunked, "_timestamp", return_value="1235"):
+        archive.backup()
+    after = len(list(Path("/backup").glob("*.chk")))
+    assert after - before <= 2
+
+    archive.restore("1235", "/restored")
+    assert Path("/restored/big.bin").read_bytes() == data + b"appended"
+
+def test_chunked_backup_reads_each_file_once(our_fs):
+    archive = make_archive(ArchiveChunked)
+    with (
+        patch.object(ArchiveChunked, "_timestamp", return_value="1234"),
+        patch("backup_oop.hash_all") as hasher,
+        patch("backup_oop.chunk_stream", wraps=chunk_stream) as spy,
+    ):
+        manifest = archive.backup()
+    assert not hasher.called
+    assert spy.call_count == len(FILES)
+    assert sorted(manifest) == sorted(hash_all("/src"))
+
+def test_chunk_boundary_depends_on_whole_window():
+    data = bytearray(random.Random(2).randbytes(4 * MAX_CHUNK))
+    cut = find_boundary(data, 0, True)
+    assert cut < MAX_CHUNK
+    data[cut - WINDOW // 2] ^= 0xFF
+    assert find_boundary(data, 0, True) != cut
@@ -0,0 +1,63 @@
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from backup_packed import ArchivePacked, COMPRESSORS
+
+FILES = {"a.txt": "aaa", "b.txt": "bbb", "sub_dir/c.txt": "ccc"}
+
+@pytest.fixture
+def our_fs(fs):
+    for name, contents in FILES.items():
+        fs.create_file(Path("/src", name), contents=contents)
+    return fs
+
+def backup_at(archive, timestamp):
+    with patch.object(ArchivePacked, "_timestamp", return_value=timestamp):
+        return archive.backup()
+
+def test_packed_backup_creates_single_pack(our_fs):
+    archive = ArchivePacked("/src", "/backup")
+    backup_at(archive, "1234")
+    assert len(list(Path("/backup").glob("*.pack"))) == 1
+    assert not list(Path("/backup").glob("*.bck"))
+    assert Path("/backup", ArchivePacked.INDEX_FILE).exists()
+
+@pytest.mark.parametrize("codec", COMPRESSORS.keys())
+def test_packed_objects_can_be_fetched(our_fs, codec):
+    archive = ArchivePacked("/src", "/backup", codec)
+    manifest = backup_at(archive, "1234")
+    reopened = ArchivePacked("/src", "/backup")
+    for filename, hash_code in manifest:
+        assert reopened.fetch(hash_code) == FILES[filename].encode()
+
+def test_packed_unknown_object(our_fs):
+    archive = ArchivePacked("/src", "/backup")
+    with pytest.raises(KeyError):
+        archive.fetch("0123456789abcdef")
+
+def test_packed_rolls_over_to_new_pack(our_fs):
+    archive = ArchivePacked("/src", "/backup", pack_size=1)
+    backup_at(archive, "1234")
+    assert len(list(Path("/backup").glob("*.pack"))) == len(FILES)
+
+def test_packed_restore(our_fs):
+    archive = ArchivePacked("/src", "/backup", "zlib")
+    backup_at(archive, "1234")
+    archive.restore("1234", "/restored")
+    for name, contents in FILES.items():
+        assert Path("/restored", name).read_text() == contents
+
+def test_packed_compact_drops_unreferenced(our_fs):
+    archive = ArchivePacked("/src", "/backup")
+    first = dict(backup_at(archive, "1234"))
+    Path("/src/a.txt").write_text("changed")
+    second = dict(backup_at(archive, "1235"))
+    Path("/backup/1234.csv").unlink()
+
+    assert archive.compact() == 1
+    with pytest.raises(KeyError):
+        archive.fetch(first["a.txt"])
+    reopened = ArchivePacked("/src", "/backup")
+    assert reopened.fetch(second["a.txt"]) == b"changed"
+    assert len(list(Path("/backup").glob("*.pack"))) == 1
@@ -0,0 +1,25 @@
+import pytest
+
+from hash_all import hash_all
+from hash_parallel import hash_all_parallel, hash_file, BUFFER_SIZE
+
+FILES = {"a.txt": "aaa", "b.txt": "bbb", "sub_dir/c.txt": "ccc"}
+
+@pytest.fixture
+def our_fs(fs):
+    for name, contents in FILES.items():
+        fs.create_file(name, contents=contents)
+
+def test_streamed_matches_original(our_fs):
+    assert sorted(hash_all_parallel(".", 1)) == sorted(hash_all("."))
+
+def test_streamed_spans_several_blocks(fs):
+    fs.create_file("big.txt", contents="x" * (3 * BUFFER_SIZE + 1))
+    assert hash_all(".") == [("big.txt", hash_file("big.txt"))]
+
+def test_parallel_matches_original(tmp_path):
+    for name, contents in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(contents)
+    assert sorted(hash_all_parallel(tmp_path, 2)) == sorted(hash_all(tmp_path))
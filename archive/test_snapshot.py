@@ -0,0 +1,65 @@
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from backup import backup
+from snapshot import (
+    diff_manifests, diff_snapshots, list_snapshots, read_manifest, restore
+)
+
+FILES = {"a.txt": "aaa", "b.txt": "bbb", "sub_dir/c.txt": "ccc"}
+
+@pytest.fixture
+def our_fs(fs):
+    for name, contents in FILES.items():
+        fs.create_file(Path("/src", name), contents=contents)
+    return fs
+
+def backup_at(timestamp):
+    with patch("backup.current_time", return_value=timestamp):
+        return backup("/src", "/backup")
+
+def test_diff_identical():
+    manifest = [("a.txt", "1234"), ("b.txt", "5678")]
+    assert diff_manifests(manifest, manifest) == ([], [], [])
+
+def test_diff_added_removed_changed():
+    old = [("a.txt", "1111"), ("b.txt", "2222"), ("c.txt", "3333")]
+    new = [("b.txt", "2222"), ("c.txt", "4444"), ("d.txt", "5555")]
+    assert diff_manifests(old, new) == (["d.txt"], ["a.txt"], ["c.txt"])
+
+def test_snapshots_listed_in_order(our_fs):
+    backup_at("900")
+    backup_at("1000")
+    assert list_snapshots("/backup") == ["900", "1000"]
+
+def test_diff_snapshots(our_fs):
+    backup_at("1234")
+    Path("/src/a.txt").write_text("changed")
+    Path("/src/b.txt").unlink()
+    Path("/src/d.txt").write_text("ddd")
+    backup_at("1235")
+    assert diff_snapshots("/backup", "1234", "1235") == \
+        (["d.txt"], ["b.txt"], ["a.txt"])
+
+def test_restore_into_empty_directory(our_fs):
+    backup_at("1234")
+    copied = restore("/backup", "1234", "/restored")
+    assert sorted(copied) == sorted(FILES)
+    for name, contents in FILES.items():
+        assert Path("/restored", name).read_text() == contents
+
+def test_restore_only_copies_differences(our_fs):
+    backup_at("1234")
+    restore("/backup", "1234", "/restored")
+    Path("/restored/a.txt").write_text("damaged")
+    assert restore("/backup", "1234", "/restored") == ["a.txt"]
+    assert Path("/restored/a.txt").read_text() == FILES["a.txt"]
+
+def test_read_manifest_with_extra_columns(our_fs):
+    our_fs.create_file(
+        "/backup/1234.csv",
+        contents="filename,hash,size\nb.txt,2222,3\na.txt,1111,3\n"
+    )
+    assert read_manifest("/backup", "1234") == \
+        [("a.txt", "1111"), ("b.txt", "2222")]
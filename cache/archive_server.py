@@ -0,0 +1,103 @@
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from locking import atomic_writer
+
+class ServerException(Exception):
+    def __init__(self, status, message):
+        self.status = status
+        self.message = message
+
+
+class ArchiveRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    disable_nagle_algorithm = True  # don't delay small responses
+
+    def do_HEAD(self):
+        self._dispatch(self._handle_head)
+
+    def do_GET(self):
+        self._dispatch(self._handle_get)
+
+    def do_PUT(self):
+        self._dispatch(self._handle_put)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, handler):
+        try:
+            handler(self._get_path())
+        except ServerException as exc:
+            self.send_response(int(exc.status), exc.message)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _handle_head(self, full_path):
+        self._require(full_path)
+        self.send_response(int(HTTPStatus.OK))
+        self.send_header("Content-Length", str(full_path.stat().st_size))
+        self.end_headers()
+
+    def _handle_get(self, full_path):
+        self._require(full_path)
+        size = full_path.stat().st_size
+        byte_range = self._get_range(size)
+        if byte_range is None:
+            start, end = 0, size - 1
+            self.send_response(int(HTTPStatus.OK))
+        else:
+            start, end = byte_range
+            self.send_response(int(HTTPStatus.PARTIAL_CONTENT))
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        with open(full_path, "rb") as reader:
+            reader.seek(start)
+            self.wfile.write(reader.read(end - start + 1))
+
+    def _handle_put(self, full_path):
+        length = int(self.headers.get("Content-Length", 0))
+        with atomic_writer(full_path, "wb") as writer:
+            writer.write(self.rfile.read(length))
+        self.send_response(int(HTTPStatus.CREATED))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _get_path(self):
+        name = self.path.lstrip("/")
+        if (not name) or (Path(name).name != name):
+            raise ServerException(HTTPStatus.BAD_REQUEST, f"bad path {name}")
+        return Path(self.server.root_dir, name)
+
+    def _get_range(self, size):
+        header = self.headers.get("Range")
+        if (header is None) or (size == 0):
+            return None
+        if not header.startswith("bytes="):
+            raise ServerException(HTTPStatus.BAD_REQUEST, "bad range")
+        start, end = header[len("bytes="):].split("-")
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+        if start >= size:
+            raise ServerException(
+                HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, "bad range"
+            )
+        return start, end
+
+    def _require(self, full_path):
+        if not full_path.is_file():
+            raise ServerException(HTTPStatus.NOT_FOUND, "not found")
+
+
+def make_server(root_dir, port=0):
+    server = ThreadingHTTPServer(("localhost", port), ArchiveRequestHandler)
+    server.root_dir = Path(root_dir)
+    return server
+
+if __name__ == "__main__":
+    assert len(sys.argv) == 3, "Usage: archive_server.py root_dir port"
+    server = make_server(sys.argv[1], int(sys.argv[2]))
+    server.serve_forever()
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from exceptions import CacheException
-from hash_stream import hash_stream
+from hash_stream import hash_file
 
 # mccole:class
 class CacheBase(ABC):
     CACHE_SUFFIX = "cache"
+    HASH_ALGORITHM = "md5"
+    WORKERS = None  # use the thread pool's default
 
     def __init__(self, index, cache_dir):
         self.index = index
@@ -30,8 +33,7 @@ class CacheBase(ABC):
         return self.index.known()
 
     def _make_identifier(self, local_path):
-        with open(local_path, "rb") as reader:
-            return hash_stream(reader)
+        return hash_file(local_path, self.HASH_ALGORITHM)
 
     def _make_cache_path(self, identifier):
         return Path(self.cache_dir, f"{identifier}.{self.CACHE_SUFFIX}")
@@ -40,3 +42,30 @@ class CacheBase(ABC):
     def _add(self, identifier, local_path):
         """Add a file with a given identifer from a given local path."""
     # mccole:/class
+
+    def add_many(self, local_paths):
+        local_paths = list(local_paths)
+        with self._pool() as pool:
+            identifiers = list(pool.map(self._make_identifier, local_paths))
+        self.index.add_many(identifiers)
+        unique = dict(zip(identifiers, local_paths))
+        self._add_many(list(unique.keys()), list(unique.values()))
+        return identifiers
+
+    def prefetch(self, identifiers):
+        identifiers = list(dict.fromkeys(identifiers))
+        known = self.index.known()
+        for identifier in identifiers:
+            if identifier not in known:
+                raise CacheException(f"Unknown file identifier {identifier}")
+        self._prefetch(identifiers)
+
+    def _add_many(self, identifiers, local_paths):
+        with self._pool() as pool:
+            list(pool.map(self._add, identifiers, local_paths))
+
+    def _prefetch(self, identifiers):
+        pass
+
+    def _pool(self):
+        return ThreadPoolExecutor(max_workers=self.WORKERS)
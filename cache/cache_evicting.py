@@ -0,0 +1,178 @@
+import json
+import shutil
+import threading
+from pathlib import Path
+
+from cache_limited import CacheLimited
+from eviction import PolicyLRU
+from exceptions import CacheException
+
+class CacheEvicting(CacheLimited):
+    STATE_FILE = "eviction.json"
+
+    def __init__(self, index, cache_dir, archive_dir, local_limit,
+                 policy=None, byte_limit=None):
+        super().__init__(index, cache_dir, archive_dir, local_limit)
+        self.policy = policy if policy is not None else PolicyLRU()
+        self.byte_limit = byte_limit
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.lock = threading.RLock()
+        self._sizes = {}
+        self._used = 0
+        self._load_state()
+
+    def get_cache_path(self, identifier):
+        if not self.index.has(identifier):
+            raise CacheException(f"Unknown file identifier {identifier}")
+        cache_path = self._make_cache_path(identifier)
+        with self.lock:
+            if identifier in self._sizes:
+                self.stats["hits"] += 1
+                self.policy.touch(identifier, self._sizes[identifier])
+            else:
+                self.stats["misses"] += 1
+                archive_path = self._make_archive_path(identifier)
+                self._copy_in(identifier, archive_path)
+        return cache_path
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                **self.stats,
+                "files": len(self._sizes),
+                "bytes": self._used,
+            }
+
+    def close(self):
+        self.save_state()
+
+    def save_state(self):
+        # State is only written when asked for or on close: if it is lost,
+        # _load_state rebuilds it from the files in the cache directory.
+        with self.lock:
+            state = {
+                "policy": self.policy.__class__.__name__,
+                "state": self.policy.get_state(),
+                "stats": self.stats,
+            }
+            with open(self._make_state_path(), "w") as writer:
+                json.dump(state, writer)
+
+    def _add(self, identifier, local_path):
+        self._add_archive(identifier, local_path)
+        with self.lock:
+            if identifier in self._sizes:
+                self.policy.touch(identifier, self._sizes[identifier])
+            else:
+                self._copy_in(identifier, local_path)
+
+    def _add_many(self, identifiers, local_paths):
+        with self._pool() as pool:
+            list(pool.map(self._add_archive, identifiers, local_paths))
+        with self.lock:
+            for (identifier, local_path) in zip(identifiers, local_paths):
+                if identifier in self._sizes:
+                    self.policy.touch(identifier, self._sizes[identifier])
+                else:
+                    self._copy_in(identifier, local_path)
+
+    def _prefetch(self, identifiers):
+        with self.lock:
+            for identifier in identifiers:
+                if identifier in self._sizes:
+                    self.policy.touch(identifier, self._sizes[identifier])
+            present = [i for i in identifiers if i in self._sizes]
+            missing = self._fits(
+                [i for i in identifiers if i not in self._sizes], present
+            )
+            sizes = [
+                self._make_archive_path(i).stat().st_size for i in missing
+            ]
+            self._make_room(sum(sizes), len(missing), pinned=set(identifiers))
+            with self._pool() as pool:
+                list(pool.map(self._fetch_archive, missing))
+            for (identifier, size) in zip(missing, sizes):
+                self._sizes[identifier] = size
+                self._used += size
+                self.policy.touch(identifier, size)
+
+    def _fits(self, identifiers, present=()):
+        # Entries from the same batch that are already cached stay put,
+        # so only the space they leave over is available.
+        if self.local_limit is not None:
+            identifiers = identifiers[:max(self.local_limit - len(present), 0)]
+        if self.byte_limit is None:
+            return identifiers
+        result, total = [], sum(self._sizes[i] for i in present)
+        for identifier in identifiers:
+            total += self._make_archive_path(identifier).stat().st_size
+            if total > self.byte_limit:
+                break
+            result.append(identifier)
+        return result
+
+    def _copy_in(self, identifier, source_path):
+        size = Path(source_path).stat().st_size
+        self._make_room(size)
+        shutil.copyfile(source_path, self._make_cache_path(identifier))
+        self._track(identifier, size)
+
+    def _admit(self, identifier):
+        # For a file that has already been put in the cache directory.
+        with self.lock:
+            size = self._make_cache_path(identifier).stat().st_size
+            self._make_room(size)
+            self._track(identifier, size)
+
+    def _track(self, identifier, size):
+        self._sizes[identifier] = size
+        self._used += size
+        self.policy.touch(identifier, size)
+
+    def _make_room(self, incoming, count=1, pinned=frozenset()):
+        while self._evictable(pinned) and self._is_full(incoming, count):
+            self._evict(self.policy.choose(pinned))
+
+    def _evictable(self, pinned):
+        # Only look at the (usually few) pinned entries, not every entry.
+        return len(self._sizes) > sum(1 for i in pinned if i in self._sizes)
+
+    def _is_full(self, incoming, count):
+        too_many = (self.local_limit is not None) and \
+            (len(self._sizes) + count > self.local_limit)
+        too_big = (self.byte_limit is not None) and \
+            (self._used + incoming > self.byte_limit)
+        return too_many or too_big
+
+    def _evict(self, identifier):
+        self._make_cache_path(identifier).unlink(missing_ok=True)
+        self._discard(identifier)
+        self.stats["evictions"] += 1
+
+    def _discard(self, identifier):
+        # Stop tracking an entry without counting it as an eviction.
+        self._used -= self._sizes.pop(identifier)
+        self.policy.remove(identifier)
+
+    def _load_state(self):
+        suffix = f".{self.CACHE_SUFFIX}"
+        for path in Path(self.cache_dir).iterdir():
+            if path.name.endswith(suffix):
+                self._sizes[path.name[:-len(suffix)]] = path.stat().st_size
+        self._used = sum(self._sizes.values())
+
+        state_path = self._make_state_path()
+        if state_path.exists():
+            with open(state_path, "r") as reader:
+                state = json.load(reader)
+            if state["policy"] == self.policy.__class__.__name__:
+                self.policy.set_state(state["state"])
+                self.stats.update(state["stats"])
+        remembered = self.policy.identifiers()
+        for identifier in remembered - set(self._sizes):
+            self.policy.remove(identifier)
+        for identifier in set(self._sizes) - remembered:
+            self.policy.touch(identifier, self._sizes[identifier])
+
+    def _make_state_path(self):
+        return Path(self.index.get_index_dir(), self.STATE_FILE)
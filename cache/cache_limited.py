@@ -50,3 +50,30 @@ class CacheLimited(CacheFilesystem):
 
     def _make_archive_path(self, identifier):
         return Path(self.archive_dir, f"{identifier}.{self.CACHE_SUFFIX}")
+
+    def _add_many(self, identifiers, local_paths):
+        with self._pool() as pool:
+            list(pool.map(self._add_archive, identifiers, local_paths))
+        for (identifier, local_path) in zip(identifiers, local_paths):
+            self._add(identifier, local_path)
+
+    def _prefetch(self, identifiers):
+        wanted = {self._make_cache_path(i) for i in identifiers}
+        cache_files = list(Path(self.cache_dir).iterdir())
+        present = {p for p in cache_files if p in wanted}
+        others = [p for p in cache_files if p not in wanted]
+        missing = [
+            i for i in identifiers
+            if self._make_cache_path(i) not in present
+        ]
+        missing = missing[:max(0, self.local_limit - len(present))]
+        excess = len(others) + len(present) + len(missing) - self.local_limit
+        for path in others[:max(0, excess)]:
+            path.unlink()
+        with self._pool() as pool:
+            list(pool.map(self._fetch_archive, missing))
+
+    def _fetch_archive(self, identifier, dest_path=None):
+        archive_path = self._make_archive_path(identifier)
+        dest_path = dest_path or self._make_cache_path(identifier)
+        shutil.copyfile(archive_path, dest_path)
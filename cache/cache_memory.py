@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from pathlib import Path
+
+from cache_base import CacheBase
+
+class CacheMemory:
+    CACHE_SUFFIX = CacheBase.CACHE_SUFFIX
+
+    def __init__(self, backing, memory_limit, object_limit):
+        assert object_limit <= memory_limit
+        self.backing = backing
+        self.memory_limit = memory_limit
+        self.object_limit = object_limit
+        self._data = OrderedDict()
+        self._used = 0
+
+    def add(self, local_path):
+        identifier = self.backing.add(local_path)
+        self._remember_file(identifier, local_path)
+        return identifier
+
+    def add_many(self, local_paths):
+        local_paths = list(local_paths)
+        identifiers = self.backing.add_many(local_paths)
+        for (identifier, local_path) in zip(identifiers, local_paths):
+            self._remember_file(identifier, local_path)
+        return identifiers
+
+    def prefetch(self, identifiers):
+        self.backing.prefetch(identifiers)
+
+    def get_bytes(self, identifier):
+        if identifier in self._data:
+            self._data.move_to_end(identifier)
+            return self._data[identifier]
+        cache_path = self.backing.get_cache_path(identifier)
+        with open(cache_path, "rb") as reader:
+            data = reader.read()
+        self._remember(identifier, data)
+        return data
+
+    def get_cache_path(self, identifier):
+        return self.backing.get_cache_path(identifier)
+
+    def has(self, identifier):
+        return (identifier in self._data) or self.backing.has(identifier)
+
+    def known(self):
+        return self.backing.known()
+
+    def in_memory(self, identifier):
+        return identifier in self._data
+
+    def _remember_file(self, identifier, local_path):
+        if Path(local_path).stat().st_size <= self.object_limit:
+            with open(local_path, "rb") as reader:
+                self._remember(identifier, reader.read())
+
+    def _remember(self, identifier, data):
+        if (len(data) > self.object_limit) or (identifier in self._data):
+            return
+        while self._used + len(data) > self.memory_limit:
+            _, evicted = self._data.popitem(last=False)
+            self._used -= len(evicted)
+        self._data[identifier] = data
+        self._used += len(data)
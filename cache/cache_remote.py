@@ -0,0 +1,32 @@
+from cache_limited import CacheLimited
+from exceptions import CacheException
+
+class CacheRemote(CacheLimited):
+    def __init__(self, index, cache_dir, transport, local_limit):
+        super().__init__(index, cache_dir, None, local_limit)
+        self.transport = transport
+
+    def get_cache_path(self, identifier):
+        if not self.index.has(identifier):
+            raise CacheException(f"Unknown file identifier {identifier}")
+        cache_path = self._make_cache_path(identifier)
+        if not cache_path.exists():
+            self._ensure_cache_space()
+            self._fetch_archive(identifier)
+        return cache_path
+
+    def _add_archive(self, identifier, local_path):
+        name = self._make_archive_name(identifier)
+        if not self.transport.exists(name):
+            self.transport.store(local_path, name)
+
+    def _fetch_archive(self, identifier, dest_path=None):
+        name = self._make_archive_name(identifier)
+        dest_path = dest_path or self._make_cache_path(identifier)
+        self.transport.fetch(name, dest_path)
+
+    def _make_archive_name(self, identifier):
+        return f"{identifier}.{self.CACHE_SUFFIX}"
+
+    def _make_archive_path(self, identifier):
+        raise CacheException("Remote archive has no local paths")
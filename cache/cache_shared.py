@@ -0,0 +1,43 @@
+"""Multi-process mode for the file cache.
+
+Several processes may share one cache directory as long as every one of
+them uses CacheShared with IndexCSVShared. Objects and the index are
+written to temporary files and renamed into place, so readers never see
+a partial file, and updates to the index are serialized by a lock file
+in the index directory.
+"""
+
+import csv
+from pathlib import Path
+
+from cache_filesystem import CacheFilesystem
+from index_csv import IndexCSV
+from locking import atomic_copy, atomic_writer, file_lock
+
+class IndexCSVShared(IndexCSV):
+    LOCK_FILE = "index.lock"
+
+    def add(self, identifier):
+        with file_lock(self._make_lock_path()):
+            super().add(identifier)
+
+    def add_many(self, identifiers):
+        with file_lock(self._make_lock_path()):
+            super().add_many(identifiers)
+
+    def save(self, index):
+        with atomic_writer(self._make_index_path(), "w") as stream:
+            writer = csv.writer(stream)
+            for entry in index:
+                when = entry.timestamp.strftime(self.TIME_FORMAT)
+                writer.writerow((entry.identifier, when))
+
+    def _make_lock_path(self):
+        return Path(self.index_dir, self.LOCK_FILE)
+
+
+class CacheShared(CacheFilesystem):
+    def _add(self, identifier, local_path):
+        cache_path = self._make_cache_path(identifier)
+        if not cache_path.exists():
+            atomic_copy(local_path, cache_path)
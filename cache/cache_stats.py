@@ -0,0 +1,255 @@
+import json
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+COUNTERS = ["hits", "misses", "evictions", "bytes_copied"]
+INDEX_METHODS = ["load", "save", "has", "known", "add", "add_many"]
+BATCH_METHODS = ["add_many", "prefetch"]
+COPY_METHODS = ["_copy_in", "_fetch_archive"]
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = {}  # upper bound in microseconds => count
+
+    def record(self, seconds):
+        micros = max(seconds * 1e6, 1)
+        bound = 2 ** math.ceil(math.log2(micros))
+        self.buckets[bound] = self.buckets.get(bound, 0) + 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, fraction):
+        target = fraction * self.count
+        seen = 0
+        for bound in sorted(self.buckets):
+            seen += self.buckets[bound]
+            if seen >= target:
+                return bound / 1e6
+        return 0.0
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "buckets": {str(b): n for (b, n) in self.buckets.items()},
+        }
+
+    @staticmethod
+    def from_dict(data):
+        result = Histogram()
+        result.count = data["count"]
+        result.total = data["total"]
+        result.buckets = {int(b): n for (b, n) in data["buckets"].items()}
+        return result
+
+
+class CacheStats:
+    def __init__(self):
+        self.counts = {name: 0 for name in COUNTERS}
+        self.latency = {}
+        self._linked = []
+        self._lock = threading.Lock()
+
+    def link(self, counters):
+        # Report another live set of counters as well, from their current
+        # values onward.
+        self._linked.append((counters, dict(counters)))
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                if name not in self.latency:
+                    self.latency[name] = Histogram()
+                self.latency[name].record(elapsed)
+
+    def as_dict(self):
+        counts = dict(self.counts)
+        for (counters, start) in self._linked:
+            for (name, value) in counters.items():
+                if name in counts:
+                    counts[name] += value - start.get(name, 0)
+        return {
+            "counts": counts,
+            "latency": {n: h.as_dict() for (n, h) in self.latency.items()},
+        }
+
+    def save(self, path):
+        with open(path, "w") as writer:
+            json.dump(self.as_dict(), writer)
+
+    @staticmethod
+    def load(path):
+        with open(path, "r") as reader:
+            data = json.load(reader)
+        result = CacheStats()
+        result.counts.update(data["counts"])
+        result.latency = {
+            n: Histogram.from_dict(h) for (n, h) in data["latency"].items()
+        }
+        return result
+
+    def summary(self):
+        counts = self.as_dict()["counts"]
+        lookups = counts["hits"] + counts["misses"]
+        rate = counts["hits"] / lookups if lookups else 0.0
+        lines = [f"{name}: {counts[name]}" for name in counts]
+        lines.append(f"hit_rate: {rate:.3f}")
+        for (name, hist) in sorted(self.latency.items()):
+            mean = hist.total / hist.count if hist.count else 0.0
+            lines.append(
+                f"{name}: n={hist.count} mean={mean:.2e}s "
+                f"p50<={hist.percentile(0.5):.2e}s "
+                f"p95<={hist.percentile(0.95):.2e}s"
+            )
+        return lines
+
+
+def instrument(cache, stats=None):
+    stats = stats if stats is not None else CacheStats()
+    copying = threading.local()
+    _wrap(cache, "_make_identifier", _timed(stats, "hash"))
+    _wrap(cache, "_add",
+          _counted_copy(stats, copying, _added_paths(cache), "copy"))
+    if getattr(cache, "archive_dir", None) is not None:
+        _wrap(cache, "_add_archive",
+              _counted_copy(stats, copying, _archived_paths(cache)))
+    for name in COPY_METHODS:
+        if hasattr(cache, name):
+            counter = _counted_copy(
+                stats, copying, _copied_paths(cache), always=True
+            )
+            _wrap(cache, name, counter)
+    # Caches that already count their own lookups and evictions are
+    # reported from those counters rather than counted twice.
+    own = getattr(cache, "stats", None)
+    if own is not None:
+        stats.link(own)
+    _wrap(cache, "get_cache_path",
+          _counted_get(stats, cache, copying, own is None))
+    if own is None and hasattr(cache, "_ensure_cache_space"):
+        _wrap(cache, "_ensure_cache_space", _counted_ensure(stats, cache))
+    for name in BATCH_METHODS:
+        _wrap(cache, name, _timed(stats, name))
+    nesting = threading.local()
+    for name in INDEX_METHODS:
+        if hasattr(cache.index, name):
+            _wrap(cache.index, name, _timed(stats, f"index.{name}", nesting))
+    return stats
+
+def _wrap(obj, name, make_wrapper):
+    original = getattr(obj, name)
+    setattr(obj, name, make_wrapper(original))
+
+def _timed(stats, name, nesting=None):
+    # Calls made by another call in the same nesting group (such as an
+    # index's add calling its own load and save) are only timed once.
+    def _make(original):
+        def _inner(*args, **kwargs):
+            if (nesting is not None) and getattr(nesting, "active", False):
+                return original(*args, **kwargs)
+            if nesting is not None:
+                nesting.active = True
+            try:
+                with stats.timer(name):
+                    return original(*args, **kwargs)
+            finally:
+                if nesting is not None:
+                    nesting.active = False
+        return _inner
+    return _make
+
+def _counted_copy(stats, copying, targets, timer=None, always=False):
+    # Bytes are counted as soon as each copy finishes, so files that a
+    # batch copies in and then evicts are still counted. The outermost
+    # copy in a thread does the counting for any copies it makes itself.
+    def _make(original):
+        def _inner(identifier, *args):
+            timing = stats.timer(timer) if timer else nullcontext()
+            if getattr(copying, "active", False):
+                with timing:
+                    return original(identifier, *args)
+            paths = targets(identifier, *args)
+            before = [always or p.exists() for p in paths]
+            copying.active = True
+            try:
+                with timing:
+                    result = original(identifier, *args)
+            finally:
+                copying.active = False
+            copied = [
+                p for (p, was) in zip(paths, before)
+                if (always or not was) and p.exists()
+            ]
+            stats.count("bytes_copied", sum(p.stat().st_size for p in copied))
+            return result
+        return _inner
+    return _make
+
+def _counted_get(stats, cache, copying, lookups):
+    def _make(original):
+        def _inner(identifier):
+            if getattr(copying, "active", False):
+                return original(identifier)
+            cache_path = cache._make_cache_path(identifier)
+            present = cache_path.exists()
+            copying.active = True
+            try:
+                with stats.timer("fetch"):
+                    result = original(identifier)
+            finally:
+                copying.active = False
+            if lookups:
+                stats.count("hits" if present else "misses")
+            if (not present) and cache_path.exists():
+                stats.count("bytes_copied", cache_path.stat().st_size)
+            return result
+        return _inner
+    return _make
+
+def _counted_ensure(stats, cache):
+    def _make(original):
+        def _inner():
+            before = len(list(Path(cache.cache_dir).iterdir()))
+            original()
+            after = len(list(Path(cache.cache_dir).iterdir()))
+            stats.count("evictions", max(0, before - after))
+        return _inner
+    return _make
+
+def _added_paths(cache):
+    def _paths(identifier, local_path):
+        paths = [cache._make_cache_path(identifier)]
+        if getattr(cache, "archive_dir", None) is not None:
+            paths.append(cache._make_archive_path(identifier))
+        return paths
+    return _paths
+
+def _archived_paths(cache):
+    def _paths(identifier, local_path):
+        return [cache._make_archive_path(identifier)]
+    return _paths
+
+def _copied_paths(cache):
+    def _paths(identifier, dest_path=None):
+        return [Path(dest_path or cache._make_cache_path(identifier))]
+    return _paths
+
+if __name__ == "__main__":
+    assert len(sys.argv) == 2, "Usage: cache_stats.py stats.json"
+    for line in CacheStats.load(sys.argv[1]).summary():
+        print(line)
@@ -0,0 +1,154 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import heapq
+
+class PolicyBase(ABC):
+    @abstractmethod
+    def touch(self, identifier, size):
+        """Record an access to (or arrival of) an identifier."""
+
+    @abstractmethod
+    def remove(self, identifier):
+        """Forget about an identifier."""
+
+    @abstractmethod
+    def choose(self, exclude=()):
+        """Choose the identifier to evict next, skipping any in exclude."""
+
+    @abstractmethod
+    def identifiers(self):
+        """Return the set of identifiers being tracked."""
+
+    @abstractmethod
+    def get_state(self):
+        """Return state as something that can be saved as JSON."""
+
+    @abstractmethod
+    def set_state(self, state):
+        """Restore state saved by get_state."""
+
+
+class PolicyLRU(PolicyBase):
+    def __init__(self):
+        self._order = OrderedDict()
+
+    def touch(self, identifier, size):
+        self._order[identifier] = True
+        self._order.move_to_end(identifier)
+
+    def remove(self, identifier):
+        self._order.pop(identifier, None)
+
+    def choose(self, exclude=()):
+        return next(i for i in self._order if i not in exclude)
+
+    def identifiers(self):
+        return set(self._order)
+
+    def get_state(self):
+        return list(self._order)
+
+    def set_state(self, state):
+        self._order = OrderedDict((ident, True) for ident in state)
+
+
+class PolicyHeap(PolicyBase):
+    # Candidates are kept in a heap so that choosing a victim is not a
+    # linear scan over everything in the cache.
+    def __init__(self):
+        self._heap = []
+        self._order = {}
+        self._keys = {}
+        self._next = 0
+
+    def remove(self, identifier):
+        # Entries stay in the heap and are skipped once they are stale.
+        self._order.pop(identifier, None)
+        self._keys.pop(identifier, None)
+
+    def choose(self, exclude=()):
+        skipped, victim = [], None
+        while self._heap:
+            key, order, identifier = self._heap[0]
+            if (self._keys.get(identifier) != key) or \
+               (self._order.get(identifier) != order):
+                heapq.heappop(self._heap)
+            elif identifier in exclude:
+                skipped.append(heapq.heappop(self._heap))
+            else:
+                victim = identifier
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        assert victim is not None, "No identifier to evict"
+        return victim
+
+    def identifiers(self):
+        return set(self._keys)
+
+    def _set_key(self, identifier, key):
+        # Ties go to whichever identifier was seen first.
+        if identifier not in self._order:
+            self._order[identifier] = self._next
+            self._next += 1
+        self._keys[identifier] = key
+        heapq.heappush(self._heap, (key, self._order[identifier], identifier))
+        if len(self._heap) > 2 * len(self._keys) + 16:
+            self._rebuild()
+
+    def _reset(self, keys):
+        self._order = {ident: i for (i, ident) in enumerate(keys)}
+        self._keys = dict(keys)
+        self._next = len(self._order)
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [
+            (key, self._order[ident], ident)
+            for (ident, key) in self._keys.items()
+        ]
+        heapq.heapify(self._heap)
+
+
+class PolicyLFU(PolicyHeap):
+    def touch(self, identifier, size):
+        self._set_key(identifier, self._keys.get(identifier, 0) + 1)
+
+    def get_state(self):
+        return self._keys
+
+    def set_state(self, state):
+        self._reset(state)
+
+
+class PolicyGDSF(PolicyHeap):
+    def __init__(self):
+        super().__init__()
+        self._clock = 0.0
+        self._counts = {}
+
+    def touch(self, identifier, size):
+        count = self._counts.get(identifier, 0) + 1
+        self._counts[identifier] = count
+        self._set_key(identifier, self._clock + count / max(size, 1))
+
+    def remove(self, identifier):
+        super().remove(identifier)
+        self._counts.pop(identifier, None)
+
+    def choose(self, exclude=()):
+        victim = super().choose(exclude)
+        self._clock = self._keys[victim]
+        return victim
+
+    def get_state(self):
+        return {
+            "clock": self._clock,
+            "counts": self._counts,
+            "priority": self._keys,
+        }
+
+    def set_state(self, state):
+        self._clock = state["clock"]
+        self._counts = dict(state["counts"])
+        self._reset(state["priority"])
@@ -1,18 +1,45 @@
 import hashlib
+import mmap
+import os
 import sys
 
-BUFFER_SIZE = 4 * 1024  # how much data to read at once
+BUFFER_SIZE = 1024 * 1024     # how much data to read at once
+MMAP_SIZE = 64 * 1024 * 1024  # map files at least this large
+DEFAULT_ALGORITHM = "md5"
 
-def hash_stream(reader):
-    hasher = hashlib.md5()
+ALGORITHMS = {
+    "md5": hashlib.md5,
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+
+def hash_stream(reader, algorithm=DEFAULT_ALGORITHM,
+                buffer_size=BUFFER_SIZE):
+    hasher = ALGORITHMS[algorithm]()
+    view = memoryview(bytearray(buffer_size))
     while True:
-        block = reader.read(BUFFER_SIZE)
-        if not block:
+        num_read = reader.readinto(view)
+        if not num_read:
             break
-        hasher.update(block)
+        hasher.update(view[:num_read])
+    return hasher.hexdigest()
+
+def hash_mapped(reader, algorithm=DEFAULT_ALGORITHM):
+    hasher = ALGORITHMS[algorithm]()
+    with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        hasher.update(mapped)
     return hasher.hexdigest()
 
+def hash_file(path, algorithm=DEFAULT_ALGORITHM):
+    size = os.stat(path).st_size
+    with open(path, "rb") as reader:
+        if size >= MMAP_SIZE:
+            return hash_mapped(reader, algorithm)
+        buffer_size = max(1, min(size, BUFFER_SIZE))
+        return hash_stream(reader, algorithm, buffer_size)
+
 if __name__ == "__main__":
-    reader = open(sys.argv[1], "rb")
-    result = hash_stream(reader)
-    print(result)
+    assert len(sys.argv) in (2, 3), \
+        "Usage: hash_stream.py filename [algorithm]"
+    algorithm = sys.argv[2] if len(sys.argv) == 3 else DEFAULT_ALGORITHM
+    print(hash_file(sys.argv[1], algorithm))
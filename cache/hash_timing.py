@@ -0,0 +1,65 @@
+import csv
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hash_stream import ALGORITHMS, BUFFER_SIZE, hash_mapped, hash_stream
+
+KB = 1024
+MB = 1024 * KB
+ORIGINAL_BUFFER = 4 * KB
+SIZES = [4 * KB, 1 * MB, 64 * MB, 256 * MB]
+
+def hash_original(reader, algorithm):
+    hasher = hashlib.new(algorithm)
+    while True:
+        block = reader.read(ORIGINAL_BUFFER)
+        if not block:
+            break
+        hasher.update(block)
+    return hasher.hexdigest()
+
+def hash_readinto(reader, algorithm):
+    size = os.fstat(reader.fileno()).st_size
+    return hash_stream(reader, algorithm, max(1, min(size, BUFFER_SIZE)))
+
+METHODS = {
+    "original": hash_original,
+    "readinto": hash_readinto,
+    "mmap": hash_mapped,
+}
+
+def throughput(method, path, algorithm, size):
+    start = time.time()
+    with open(path, "rb") as reader:
+        method(reader, algorithm)
+    elapsed = max(time.time() - start, 1e-9)
+    return size / MB / elapsed
+
+def sweep(sizes):
+    result = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            path = Path(temp_dir, f"{size}.bin")
+            path.write_bytes(os.urandom(size))
+            for algorithm in ALGORITHMS:
+                rates = [
+                    throughput(m, path, algorithm, size)
+                    for m in METHODS.values()
+                ]
+                result.append([size, algorithm, *rates])
+            path.unlink()
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["bytes", "algorithm", *[f"{m}_mb_s" for m in METHODS]])
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or SIZES
+    report(sweep(sizes))
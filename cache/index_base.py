@@ -35,6 +35,12 @@ class IndexBase(ABC):
         self.save(index)
 # mccole:/class
 
+    def add_many(self, identifiers):
+        index = self.load()
+        when = current_time()
+        index.extend(CacheEntry(ident, when) for ident in identifiers)
+        self.save(index)
+
 # mccole:abstract
     @abstractmethod
     def load(self):
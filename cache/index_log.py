@@ -0,0 +1,74 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+
+from exceptions import CacheException
+from index_base import CacheEntry, IndexBase, current_time
+
+class IndexLog(IndexBase):
+    INDEX_FILE = "index.log"
+    COMPACT_FACTOR = 2  # compact when log has this many lines per entry
+    COMPACT_MIN = 100   # but don't bother with logs shorter than this
+
+    def has(self, identifier):
+        return identifier in self._entries
+
+    def known(self):
+        return set(self._entries.keys())
+
+    def add(self, identifier):
+        self.add_many([identifier])
+
+    def add_many(self, identifiers):
+        when = current_time()
+        entries = [CacheEntry(ident, when) for ident in identifiers]
+        with open(self._make_index_path(), "a") as stream:
+            self._write_entries(stream, entries)
+        for entry in entries:
+            self._entries[entry.identifier] = entry
+        self._log_len += len(entries)
+        if self._needs_compaction():
+            self.compact()
+
+    def load(self):
+        if not self.index_dir:
+            raise CacheException("Cache directory not set in index")
+        return list(self._entries.values())
+
+    def save(self, index):
+        index_path = self._make_index_path()
+        temp_path = index_path.with_suffix(".tmp")
+        with open(temp_path, "w") as stream:
+            self._write_entries(stream, index)
+        temp_path.replace(index_path)
+        self._entries = {entry.identifier: entry for entry in index}
+        self._log_len = len(index)
+
+    def compact(self):
+        self.save(self.load())
+
+    def _initialize_index(self):
+        index_path = self._make_index_path()
+        index_path.touch()
+        self._entries = {}
+        self._log_len = 0
+        with open(index_path, "r") as stream:
+            for r in csv.reader(stream):
+                when = datetime.strptime(r[1], self.TIME_FORMAT)
+                self._entries[r[0]] = CacheEntry(r[0], when)
+                self._log_len += 1
+
+    def _needs_compaction(self):
+        return (self._log_len >= self.COMPACT_MIN) and \
+            (self._log_len >= self.COMPACT_FACTOR * len(self._entries))
+
+    def _write_entries(self, stream, entries):
+        writer = csv.writer(stream)
+        for entry in entries:
+            when = entry.timestamp.strftime(self.TIME_FORMAT)
+            writer.writerow((entry.identifier, when))
+
+    def _make_index_path(self):
+        if not self.index_dir:
+            raise CacheException("Cache directory not set in index")
+        return Path(self.index_dir, self.INDEX_FILE)
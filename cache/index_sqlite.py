@@ -0,0 +1,67 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from exceptions import CacheException
+from index_base import CacheEntry, IndexBase, current_time
+
+CREATE = """
+CREATE TABLE IF NOT EXISTS entries (
+    identifier TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL
+)
+"""
+INSERT = "INSERT OR REPLACE INTO entries VALUES (?, ?)"
+SELECT_ALL = "SELECT identifier, timestamp FROM entries ORDER BY rowid"
+SELECT_ONE = "SELECT 1 FROM entries WHERE identifier = ?"
+SELECT_IDS = "SELECT identifier FROM entries"
+DELETE_ALL = "DELETE FROM entries"
+
+class IndexSQLite(IndexBase):
+    INDEX_FILE = "index.db"
+
+    def has(self, identifier):
+        cursor = self._conn.execute(SELECT_ONE, (identifier,))
+        return cursor.fetchone() is not None
+
+    def known(self):
+        return {row[0] for row in self._conn.execute(SELECT_IDS)}
+
+    def add(self, identifier):
+        self.add_many([identifier])
+
+    def add_many(self, identifiers):
+        when = current_time().strftime(self.TIME_FORMAT)
+        with self._conn:
+            self._conn.executemany(
+                INSERT, ((ident, when) for ident in identifiers)
+            )
+
+    def load(self):
+        return [
+            CacheEntry(ident, datetime.strptime(when, self.TIME_FORMAT))
+            for (ident, when) in self._conn.execute(SELECT_ALL)
+        ]
+
+    def save(self, index):
+        rows = [
+            (entry.identifier, entry.timestamp.strftime(self.TIME_FORMAT))
+            for entry in index
+        ]
+        with self._conn:
+            self._conn.execute(DELETE_ALL)
+            self._conn.executemany(INSERT, rows)
+
+    def close(self):
+        self._conn.close()
+
+    def _initialize_index(self):
+        self._conn = sqlite3.connect(self._make_index_path())
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(CREATE)
+
+    def _make_index_path(self):
+        if not self.index_dir:
+            raise CacheException("Cache directory not set in index")
+        return Path(self.index_dir, self.INDEX_FILE)
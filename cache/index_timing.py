@@ -0,0 +1,49 @@
+import csv
+import sys
+import tempfile
+import time
+
+from index_csv import IndexCSV
+from index_log import IndexLog
+from index_sqlite import IndexSQLite
+
+INDEXES = [IndexCSV, IndexLog, IndexSQLite]
+LIMITS = {IndexCSV: 2000}  # don't time quadratic indexes at large sizes
+
+def time_index(cls, num):
+    idents = [f"{i:032x}" for i in range(num)]
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = cls(index_dir)
+        start = time.time()
+        for ident in idents:
+            index.add(ident)
+        middle = time.time()
+        for ident in idents:
+            assert index.has(ident)
+        end = time.time()
+    return middle - start, end - middle
+
+def sweep(sizes):
+    result = []
+    for num in sizes:
+        times = []
+        for cls in INDEXES:
+            if num > LIMITS.get(cls, num):
+                times.extend(["", ""])
+            else:
+                times.extend(time_index(cls, num))
+        result.append([num, *times])
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    header = ["entries"]
+    for cls in INDEXES:
+        header.extend([f"add_{cls.__name__}", f"has_{cls.__name__}"])
+    writer.writerow(header)
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    report(sweep(sizes))
@@ -0,0 +1,34 @@
+import fcntl
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+@contextmanager
+def file_lock(lock_path):
+    with open(lock_path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+@contextmanager
+def atomic_writer(dest_path, mode="w"):
+    dest_path = Path(dest_path)
+    fd, temp_name = tempfile.mkstemp(
+        dir=dest_path.parent, prefix=".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode) as stream:
+            yield stream
+        os.replace(temp_name, dest_path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+def atomic_copy(source_path, dest_path):
+    with open(source_path, "rb") as reader, \
+         atomic_writer(dest_path, "wb") as writer:
+        shutil.copyfileobj(reader, writer)
@@ -0,0 +1,151 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+from cache_limited import CacheLimited
+from exceptions import CacheException
+from hash_stream import hash_stream
+from index_csv import IndexCSV
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.rate = rate  # bytes per second
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, amount):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + amount / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+class ThrottledReader:
+    def __init__(self, reader, limiter):
+        self._reader = reader
+        self._limiter = limiter
+
+    def readinto(self, buffer):
+        num_read = self._reader.readinto(buffer)
+        if num_read:
+            self._limiter.wait(num_read)
+        return num_read
+
+
+class Scrubber:
+    def __init__(self, cache, quarantine_dir, workers=None, rate=None):
+        self.cache = cache
+        self.quarantine_dir = Path(quarantine_dir)
+        self.workers = workers
+        self.limiter = RateLimiter(rate) if rate else None
+        self.result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self):
+        suffix = f".{self.cache.CACHE_SUFFIX}"
+        paths = [
+            p for p in Path(self.cache.cache_dir).iterdir()
+            if p.name.endswith(suffix)
+        ]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            checked = [r for r in pool.map(self._check, paths) if r]
+        corrupt = [ident for (ident, ok) in checked if not ok]
+        repaired = [ident for ident in corrupt if self._repair(ident)]
+        self.result = {
+            "checked": len(checked),
+            "corrupt": corrupt,
+            "repaired": repaired,
+        }
+        return self.result
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self):
+        self._thread.join()
+        return self.result
+
+    def _check(self, path):
+        if self._stop.is_set():
+            return None
+        identifier = path.name[:-len(f".{self.cache.CACHE_SUFFIX}")]
+        return (identifier, self._hash(path) == identifier)
+
+    def _hash(self, path):
+        with open(path, "rb") as reader:
+            if self.limiter:
+                reader = ThrottledReader(reader, self.limiter)
+            return hash_stream(reader, self.cache.HASH_ALGORITHM)
+
+    def _repair(self, identifier):
+        cache_path = self.cache._make_cache_path(identifier)
+        self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+        # Share the cache's lock (if it has one) so that a background
+        # scrub doesn't change its entries while it is making room.
+        with self._lock():
+            if cache_path.exists():
+                quarantine_path = Path(self.quarantine_dir, cache_path.name)
+                shutil.move(cache_path, quarantine_path)
+            self._forget(identifier)
+        if not hasattr(self.cache, "_fetch_archive"):
+            return False
+        # Fetch beside the cache file and only move the copy into place
+        # once it checks out, so the cache never holds unverified data.
+        fd, temp_name = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=".", suffix=".tmp"
+        )
+        os.close(fd)
+        temp_path = Path(temp_name)
+        try:
+            self.cache._fetch_archive(identifier, temp_path)
+            verified = self._hash(temp_path) == identifier
+        except (OSError, CacheException):
+            verified = False
+        if not verified:
+            temp_path.unlink(missing_ok=True)
+            return False
+        with self._lock():
+            # The cache may have fetched a good copy while this one was
+            # being checked.
+            if identifier in getattr(self.cache, "_sizes", {}):
+                temp_path.unlink()
+                return True
+            os.replace(temp_path, cache_path)
+            if hasattr(self.cache, "_admit"):
+                self.cache._admit(identifier)
+        return True
+
+    def _forget(self, identifier):
+        # Caches that keep track of their entries must drop a quarantined
+        # one, or they would go on reporting it as cached. This isn't an
+        # eviction, so it doesn't change the cache's eviction count.
+        if identifier in getattr(self.cache, "_sizes", {}):
+            self.cache._discard(identifier)
+
+    def _lock(self):
+        return getattr(self.cache, "lock", None) or nullcontext()
+
+if __name__ == "__main__":
+    assert len(sys.argv) in (4, 5), \
+        "Usage: scrub.py cache_dir archive_dir quarantine_dir [bytes_per_sec]"
+    cache_dir, archive_dir, quarantine_dir = sys.argv[1:4]
+    rate = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    cache = CacheLimited(IndexCSV(archive_dir), cache_dir, archive_dir, None)
+    result = Scrubber(cache, quarantine_dir, rate=rate).run()
+    print(f"checked {result['checked']}")
+    for identifier in result["corrupt"]:
+        state = "repaired" if identifier in result["repaired"] else "lost"
+        print(f"{identifier} {state}")
@@ -0,0 +1,144 @@
+from pathlib import Path
+import pytest
+
+from cache_evicting import CacheEvicting
+from eviction import PolicyGDSF, PolicyLFU, PolicyLRU
+from index_log import IndexLog
+
+CACHE_DIR = Path("/cache")
+ARCHIVE_DIR = Path("/archive")
+LOCAL_LIMIT = 2
+
+@pytest.fixture
+def disk(fs):
+    fs.create_dir(CACHE_DIR)
+    fs.create_dir(ARCHIVE_DIR)
+    return fs
+
+def make_cache(policy=None, local_limit=LOCAL_LIMIT, byte_limit=None):
+    index = IndexLog(ARCHIVE_DIR)
+    return CacheEvicting(
+        index, CACHE_DIR, ARCHIVE_DIR, local_limit, policy, byte_limit
+    )
+
+def add_files(disk, cache, contents):
+    idents = {}
+    for text in contents:
+        filename = f"file_{text[0]}_{len(text)}.txt"
+        disk.create_file(filename, contents=text)
+        idents[text] = cache.add(filename)
+    return idents
+
+def cached(cache):
+    return {p.stem for p in CACHE_DIR.iterdir()}
+
+def test_lru_evicts_least_recently_used(disk):
+    cache = make_cache(PolicyLRU())
+    idents = add_files(disk, cache, ["a", "b"])
+    cache.get_cache_path(idents["a"])
+    idents.update(add_files(disk, cache, ["c"]))
+    assert cached(cache) == {idents["a"], idents["c"]}
+
+def test_lfu_evicts_least_frequently_used(disk):
+    cache = make_cache(PolicyLFU())
+    idents = add_files(disk, cache, ["a", "b"])
+    for i in range(3):
+        cache.get_cache_path(idents["b"])
+    cache.get_cache_path(idents["a"])
+    idents.update(add_files(disk, cache, ["c"]))
+    assert cached(cache) == {idents["b"], idents["c"]}
+
+def test_gdsf_prefers_evicting_large_files(disk):
+    cache = make_cache(PolicyGDSF())
+    idents = add_files(disk, cache, ["a" * 1000, "b"])
+    idents.update(add_files(disk, cache, ["c"]))
+    assert cached(cache) == {idents["b"], idents["c"]}
+
+def test_byte_limit_respected(disk):
+    cache = make_cache(local_limit=None, byte_limit=10)
+    add_files(disk, cache, ["aaaa", "bbbb", "cccc", "dddd"])
+    assert sum(p.stat().st_size for p in CACHE_DIR.iterdir()) <= 10
+    assert cache.get_stats()["evictions"] == 2
+
+def test_counters(disk):
+    cache = make_cache()
+    idents = add_files(disk, cache, ["a", "b", "c"])
+    cache.get_cache_path(idents["c"])
+    cache.get_cache_path(idents["a"])
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 2
+    assert stats["files"] == LOCAL_LIMIT
+
+def test_evicted_files_can_be_retrieved(disk):
+    cache = make_cache()
+    idents = add_files(disk, cache, ["a", "b", "c", "d"])
+    for (text, ident) in idents.items():
+        with open(cache.get_cache_path(ident), "r") as reader:
+            assert reader.read() == text
+    assert len(list(CACHE_DIR.iterdir())) == LOCAL_LIMIT
+
+def test_state_survives_restart(disk):
+    first = make_cache(PolicyLRU())
+    idents = add_files(disk, first, ["a", "b"])
+    first.get_cache_path(idents["a"])
+    first.close()
+
+    second = make_cache(PolicyLRU())
+    idents.update(add_files(disk, second, ["c"]))
+    assert cached(second) == {idents["a"], idents["c"]}
+    assert second.get_stats()["hits"] == 1
+
+def test_state_only_written_on_close(disk):
+    cache = make_cache()
+    idents = add_files(disk, cache, ["a", "b", "c"])
+    cache.get_cache_path(idents["a"])
+    state_path = Path(ARCHIVE_DIR, CacheEvicting.STATE_FILE)
+    assert not state_path.exists()
+    cache.close()
+    assert state_path.exists()
+
+def test_add_many_respects_limit(disk):
+    cache = make_cache()
+    contents = ["a", "b", "c", "d"]
+    for text in contents:
+        disk.create_file(f"{text}.txt", contents=text)
+    idents = cache.add_many(f"{text}.txt" for text in contents)
+    assert cache.known() == set(idents)
+    assert cached(cache) == set(idents[-LOCAL_LIMIT:])
+
+def test_prefetch_brings_back_evicted(disk):
+    cache = make_cache()
+    idents = add_files(disk, cache, ["a", "b", "c", "d"])
+    wanted = [idents["a"], idents["b"]]
+    cache.prefetch(wanted)
+    assert cached(cache) == set(wanted)
+    cache.get_cache_path(idents["a"])
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 0
+
+@pytest.mark.parametrize("policy", [PolicyLRU, PolicyLFU, PolicyGDSF])
+def test_prefetch_batch_filling_cache_keeps_itself(disk, policy):
+    cache = make_cache(policy())
+    idents = add_files(disk, cache, ["a", "b", "c"])
+    for _ in range(3):
+        cache.get_cache_path(idents["c"])
+    wanted = [idents["b"], idents["a"]]
+    cache.prefetch(wanted)
+    assert cached(cache) == set(wanted)
+
+@pytest.mark.parametrize("policy", [PolicyLFU, PolicyGDSF])
+def test_heap_policy_skips_removed_and_excluded(policy):
+    p = policy()
+    for (ident, uses) in [("a", 1), ("b", 2), ("c", 3), ("d", 4)]:
+        for _ in range(uses):
+            p.touch(ident, 1)
+    assert p.choose() == "a"
+    p.remove("a")
+    assert p.choose(exclude={"b"}) == "c"
+    assert p.choose() == "b"
+    restored = policy()
+    restored.set_state(p.get_state())
+    assert restored.choose() == "b"
+    assert restored.identifiers() == {"b", "c", "d"}
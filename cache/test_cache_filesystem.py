@@ -4,6 +4,7 @@ from unittest.mock import patch
 import pytest
 
 from cache_filesystem import CacheFilesystem
+from exceptions import CacheException
 from index_csv import IndexCSV
 
 # mccole:setup
@@ -64,3 +65,24 @@ def test_filesystem_duplicate_content_only_saved_once(disk, cache):
     ident_second = cache.add("second.txt")
     assert ident_first == ident_second
     assert len(cache.known()) == 1
+
+def test_filesystem_add_many(disk, cache):
+    names = "abc"
+    for name in names:
+        disk.create_file(f"{name}.txt", contents=name)
+    idents = cache.add_many(f"{name}.txt" for name in names)
+    assert cache.known() == set(idents)
+    for (name, ident) in zip(names, idents):
+        with open(cache.get_cache_path(ident), "r") as reader:
+            assert reader.read() == name
+
+def test_filesystem_add_many_saves_index_once(disk, cache):
+    for name in "abc":
+        disk.create_file(f"{name}.txt", contents=name)
+    with patch.object(cache.index, "save", wraps=cache.index.save) as spy:
+        cache.add_many(["a.txt", "b.txt", "c.txt"])
+    assert spy.call_count == 1
+
+def test_filesystem_prefetch_unknown(disk, cache):
+    with pytest.raises(CacheException):
+        cache.prefetch(["nonexistent"])
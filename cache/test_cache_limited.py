@@ -95,3 +95,22 @@ def test_limited_all_files_can_be_retrieved(disk, cache):
         local_file = f"{name}.txt"
         cache_path = cache.get_cache_path(ident)
         assert cache_path.exists()
+
+def test_limited_add_many(disk, cache):
+    names = "abcdefg"
+    for name in names:
+        disk.create_file(f"{name}.txt", contents=name)
+    idents = cache.add_many(f"{name}.txt" for name in names)
+    assert cache.known() == set(idents)
+    assert len(list(Path(CACHE_DIR).iterdir())) == LOCAL_LIMIT
+    assert len(list(Path(ARCHIVE_DIR).iterdir())) == len(names) + 1
+
+def test_limited_prefetch_restores_from_archive(disk, cache):
+    names = "abcdefg"
+    for name in names:
+        disk.create_file(f"{name}.txt", contents=name)
+    idents = cache.add_many(f"{name}.txt" for name in names)
+    wanted = idents[:LOCAL_LIMIT]
+    cache.prefetch(wanted)
+    assert {p.name for p in Path(CACHE_DIR).iterdir()} == \
+        {cache._make_cache_path(i).name for i in wanted}
@@ -0,0 +1,69 @@
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from cache_filesystem import CacheFilesystem
+from cache_memory import CacheMemory
+from index_csv import IndexCSV
+
+CACHE_DIR = Path("/cache")
+MEMORY_LIMIT = 8
+OBJECT_LIMIT = 4
+
+@pytest.fixture
+def disk(fs):
+    fs.create_dir(CACHE_DIR)
+    return fs
+
+@pytest.fixture
+def cache(disk):
+    backing = CacheFilesystem(IndexCSV(CACHE_DIR), CACHE_DIR)
+    return CacheMemory(backing, MEMORY_LIMIT, OBJECT_LIMIT)
+
+def add_file(disk, cache, name, contents):
+    disk.create_file(name, contents=contents)
+    return cache.add(name)
+
+def test_memory_add_writes_through(disk, cache):
+    ident = add_file(disk, cache, "test.txt", "xyz")
+    assert cache.in_memory(ident)
+    assert cache.backing.has(ident)
+    assert cache.get_cache_path(ident).exists()
+
+def test_memory_small_objects_served_from_memory(disk, cache):
+    ident = add_file(disk, cache, "test.txt", "xyz")
+    with patch.object(cache.backing, "get_cache_path") as spy:
+        assert cache.get_bytes(ident) == b"xyz"
+    assert spy.call_count == 0
+
+def test_memory_large_objects_left_on_disk(disk, cache):
+    ident = add_file(disk, cache, "test.txt", "x" * (OBJECT_LIMIT + 1))
+    assert not cache.in_memory(ident)
+    assert cache.get_bytes(ident) == b"x" * (OBJECT_LIMIT + 1)
+    assert not cache.in_memory(ident)
+
+def test_memory_reads_through_on_miss(disk, cache):
+    ident = cache.backing.add(
+        disk.create_file("test.txt", contents="xyz").path
+    )
+    assert not cache.in_memory(ident)
+    assert cache.get_bytes(ident) == b"xyz"
+    assert cache.in_memory(ident)
+
+def test_memory_evicts_least_recently_used(disk, cache):
+    first = add_file(disk, cache, "a.txt", "aaaa")
+    second = add_file(disk, cache, "b.txt", "bbbb")
+    cache.get_bytes(first)
+    third = add_file(disk, cache, "c.txt", "cccc")
+    assert cache.in_memory(first)
+    assert not cache.in_memory(second)
+    assert cache.in_memory(third)
+    assert cache.get_bytes(second) == b"bbbb"
+
+def test_memory_add_many(disk, cache):
+    disk.create_file("a.txt", contents="aaa")
+    disk.create_file("b.txt", contents="b" * (OBJECT_LIMIT + 1))
+    first, second = cache.add_many(["a.txt", "b.txt"])
+    assert cache.in_memory(first)
+    assert not cache.in_memory(second)
+    assert cache.backing.has(second)
@@ -0,0 +1,116 @@
+import threading
+from http.client import RemoteDisconnected
+from pathlib import Path
+import pytest
+
+from archive_server import make_server
+from cache_remote import CacheRemote
+from exceptions import CacheException
+from index_csv import IndexCSV
+from transport import TransportHTTP, TransportLocal
+
+LOCAL_LIMIT = 2
+BLOCK_SIZE = 16
+
+@pytest.fixture
+def dirs(tmp_path):
+    result = {}
+    for name in ["cache", "archive", "index", "local"]:
+        result[name] = tmp_path / name
+        result[name].mkdir()
+    return result
+
+@pytest.fixture
+def server(dirs):
+    server = make_server(dirs["archive"])
+    thread = threading.Thread(
+        target=server.serve_forever, args=(0.01,), daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def transport(server):
+    host, port = server.server_address[:2]
+    transport = TransportHTTP(f"http://{host}:{port}/", block_size=BLOCK_SIZE)
+    yield transport
+    transport.close()
+
+def make_cache(dirs, transport):
+    index = IndexCSV(dirs["index"])
+    return CacheRemote(index, dirs["cache"], transport, LOCAL_LIMIT)
+
+def add_files(dirs, cache, contents):
+    idents = {}
+    for text in contents:
+        local_path = Path(dirs["local"], f"{text[0]}_{len(text)}.txt")
+        local_path.write_text(text)
+        idents[text] = cache.add(local_path)
+    return idents
+
+def test_http_store_and_fetch(dirs, transport):
+    source = Path(dirs["local"], "data.bin")
+    data = bytes(range(256)) * 3
+    source.write_bytes(data)
+    assert not transport.exists("data.bin")
+    transport.store(source, "data.bin")
+    assert transport.exists("data.bin")
+    dest = Path(dirs["local"], "copy.bin")
+    transport.fetch("data.bin", dest)
+    assert dest.read_bytes() == data
+
+def test_http_fetch_empty_object(dirs, transport):
+    Path(dirs["archive"], "empty.bin").write_bytes(b"")
+    dest = Path(dirs["local"], "copy.bin")
+    transport.fetch("empty.bin", dest)
+    assert dest.read_bytes() == b""
+
+def test_http_fetch_missing_object(dirs, transport):
+    with pytest.raises(CacheException):
+        transport.fetch("missing.bin", Path(dirs["local"], "copy.bin"))
+    assert not Path(dirs["local"], "copy.bin").exists()
+
+def test_http_reuses_connections(dirs, transport):
+    data = b"x" * (BLOCK_SIZE * 10)
+    Path(dirs["archive"], "big.bin").write_bytes(data)
+    for i in range(5):
+        transport.fetch("big.bin", Path(dirs["local"], f"copy_{i}.bin"))
+    assert transport.connections_made == 1
+
+class StaleConnection:
+    def __init__(self):
+        self.closed = False
+
+    def request(self, *args, **kwargs):
+        raise RemoteDisconnected("closed while idle")
+
+    def close(self):
+        self.closed = True
+
+def test_http_retries_stale_connection(dirs, transport):
+    Path(dirs["archive"], "data.bin").write_bytes(b"data")
+    stale = StaleConnection()
+    transport._idle.put_nowait(stale)
+    dest = Path(dirs["local"], "copy.bin")
+    transport.fetch("data.bin", dest)
+    assert dest.read_bytes() == b"data"
+    assert stale.closed
+    assert transport.connections_made == 1
+
+def test_remote_cache_round_trip(dirs, transport):
+    cache = make_cache(dirs, transport)
+    contents = ["a" * 40, "b" * 40, "c" * 40, "d" * 40]
+    idents = add_files(dirs, cache, contents)
+    assert len(list(dirs["archive"].iterdir())) == len(contents)
+    assert len(list(dirs["cache"].iterdir())) == LOCAL_LIMIT
+    for (text, ident) in idents.items():
+        assert cache.get_cache_path(ident).read_text() == text
+    assert len(list(dirs["cache"].iterdir())) == LOCAL_LIMIT
+
+def test_remote_cache_with_local_transport(dirs):
+    cache = make_cache(dirs, TransportLocal(dirs["archive"]))
+    idents = add_files(dirs, cache, ["a", "b", "c"])
+    for (text, ident) in idents.items():
+        assert cache.get_cache_path(ident).read_text() == text
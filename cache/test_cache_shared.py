@@ -0,0 +1,57 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pytest
+
+from cache_shared import CacheShared, IndexCSVShared
+
+NUM_WRITERS = 8
+NUM_FILES = 10
+
+def make_cache(cache_dir):
+    return CacheShared(IndexCSVShared(cache_dir), cache_dir)
+
+def writer(cache_dir, source_dir, worker):
+    cache = make_cache(cache_dir)
+    result = {}
+    for i in range(NUM_FILES):
+        for name in (f"shared_{i}.txt", f"private_{worker}_{i}.txt"):
+            result[name] = cache.add(Path(source_dir, name))
+    return result
+
+@pytest.fixture
+def dirs(tmp_path):
+    cache_dir = tmp_path / "cache"
+    source_dir = tmp_path / "source"
+    cache_dir.mkdir()
+    source_dir.mkdir()
+    for i in range(NUM_FILES):
+        Path(source_dir, f"shared_{i}.txt").write_text(f"shared {i}")
+        for worker in range(NUM_WRITERS):
+            name = f"private_{worker}_{i}.txt"
+            Path(source_dir, name).write_text(f"private {worker} {i}")
+    return cache_dir, source_dir
+
+def test_shared_single_process(dirs):
+    cache_dir, source_dir = dirs
+    idents = writer(cache_dir, source_dir, 0)
+    cache = make_cache(cache_dir)
+    assert cache.known() == set(idents.values())
+
+def test_shared_many_writers(dirs):
+    cache_dir, source_dir = dirs
+    with ProcessPoolExecutor(max_workers=NUM_WRITERS) as pool:
+        futures = [
+            pool.submit(writer, cache_dir, source_dir, w)
+            for w in range(NUM_WRITERS)
+        ]
+        results = [f.result() for f in futures]
+
+    cache = make_cache(cache_dir)
+    expected = {}
+    for r in results:
+        expected.update(r)
+    assert cache.known() == set(expected.values())
+    for (name, ident) in expected.items():
+        cache_path = cache.get_cache_path(ident)
+        assert cache_path.read_text() == Path(source_dir, name).read_text()
+    assert not list(cache_dir.glob(".*.tmp"))
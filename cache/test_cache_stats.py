@@ -0,0 +1,121 @@
+from pathlib import Path
+import pytest
+
+from cache_evicting import CacheEvicting
+from cache_filesystem import CacheFilesystem
+from cache_limited import CacheLimited
+from cache_stats import CacheStats, Histogram, instrument
+from index_csv import IndexCSV
+
+CACHE_DIR = Path("/cache")
+ARCHIVE_DIR = Path("/archive")
+LOCAL_LIMIT = 2
+
+@pytest.fixture
+def disk(fs):
+    fs.create_dir(CACHE_DIR)
+    fs.create_dir(ARCHIVE_DIR)
+    return fs
+
+def add_files(disk, cache, names):
+    idents = {}
+    for name in names:
+        disk.create_file(f"{name}.txt", contents=name * 3)
+        idents[name] = cache.add(f"{name}.txt")
+    return idents
+
+def test_histogram_percentiles():
+    hist = Histogram()
+    for micros in [1, 2, 3, 100]:
+        hist.record(micros / 1e6)
+    assert hist.count == 4
+    assert hist.percentile(0.5) == 2 / 1e6
+    assert hist.percentile(1.0) == 128 / 1e6
+
+def test_filesystem_counts(disk):
+    cache = CacheFilesystem(IndexCSV(CACHE_DIR), CACHE_DIR)
+    stats = instrument(cache)
+    idents = add_files(disk, cache, "ab")
+    cache.get_cache_path(idents["a"])
+    result = stats.as_dict()
+    assert result["counts"]["hits"] == 1
+    assert result["counts"]["bytes_copied"] == 6
+    assert result["latency"]["hash"]["count"] == 2
+    assert result["latency"]["copy"]["count"] == 2
+    assert result["latency"]["index.add"]["count"] == 2
+    assert result["latency"]["index.has"]["count"] == 1
+    assert "index.load" not in result["latency"]
+
+def test_limited_counts(disk):
+    cache = CacheLimited(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                         LOCAL_LIMIT)
+    stats = instrument(cache)
+    idents = add_files(disk, cache, "abc")
+    cache.get_cache_path(idents["c"])
+    evicted = next(
+        i for i in idents.values() if not cache._make_cache_path(i).exists()
+    )
+    cache.get_cache_path(evicted)
+    counts = stats.as_dict()["counts"]
+    assert counts["evictions"] == 2
+    assert counts["misses"] == 1
+    assert counts["hits"] == 1
+    assert counts["bytes_copied"] == 3 * 2 * 3 + 3
+
+def test_evicting_counts(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    stats = instrument(cache)
+    add_files(disk, cache, "abcd")
+    assert stats.as_dict()["counts"]["evictions"] == 2
+
+def test_batch_counts(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    stats = instrument(cache)
+    for name in "abc":
+        disk.create_file(f"{name}.txt", contents=name * 3)
+    idents = cache.add_many(f"{name}.txt" for name in "abc")
+    result = stats.as_dict()
+    # The file evicted during the batch was still copied into the cache.
+    assert result["counts"]["bytes_copied"] == 2 * 3 * 3
+    assert result["counts"]["evictions"] == 1
+    cache.prefetch(idents[:1])
+    result = stats.as_dict()
+    assert result["counts"]["bytes_copied"] == 2 * 3 * 3 + 3
+    assert result["counts"]["evictions"] == 2
+    assert result["latency"]["add_many"]["count"] == 1
+    assert result["latency"]["prefetch"]["count"] == 1
+    assert result["latency"]["index.add_many"]["count"] == 1
+
+def test_filesystem_batch_counts(disk):
+    cache = CacheFilesystem(IndexCSV(CACHE_DIR), CACHE_DIR)
+    stats = instrument(cache)
+    for name in "abc":
+        disk.create_file(f"{name}.txt", contents=name * 3)
+    cache.add_many(f"{name}.txt" for name in "abc")
+    result = stats.as_dict()
+    assert result["counts"]["bytes_copied"] == 3 * 3
+    assert result["latency"]["copy"]["count"] == 3
+
+def test_evicting_cache_counters_are_shared(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    cache.stats["hits"] = 5
+    stats = instrument(cache)
+    idents = add_files(disk, cache, "abc")
+    cache.get_cache_path(idents["c"])
+    cache.get_cache_path(idents["a"])
+    counts = stats.as_dict()["counts"]
+    assert counts["hits"] == 1
+    assert counts["misses"] == 1
+    assert counts["evictions"] == cache.stats["evictions"] == 2
+
+def test_stats_round_trip(disk):
+    cache = CacheFilesystem(IndexCSV(CACHE_DIR), CACHE_DIR)
+    stats = instrument(cache)
+    add_files(disk, cache, "ab")
+    stats.save("/stats.json")
+    loaded = CacheStats.load("/stats.json")
+    assert loaded.as_dict() == stats.as_dict()
+    assert any(line.startswith("hit_rate") for line in loaded.summary())
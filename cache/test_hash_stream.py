@@ -0,0 +1,39 @@
+import hashlib
+import io
+from unittest.mock import patch
+import pytest
+
+from hash_stream import ALGORITHMS, hash_file, hash_mapped, hash_stream
+from cache_filesystem import CacheFilesystem
+from index_csv import IndexCSV
+
+DATA = bytes(range(256)) * 100
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS.keys())
+def test_hash_stream_matches_hashlib(algorithm):
+    expected = hashlib.new(algorithm, DATA).hexdigest()
+    assert hash_stream(io.BytesIO(DATA), algorithm) == expected
+
+def test_hash_stream_small_buffer():
+    expected = hashlib.md5(DATA).hexdigest()
+    assert hash_stream(io.BytesIO(DATA), "md5", buffer_size=7) == expected
+
+def test_hash_stream_empty():
+    assert hash_stream(io.BytesIO(b"")) == hashlib.md5(b"").hexdigest()
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS.keys())
+def test_hash_mapped_matches_stream(tmp_path, algorithm):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    with open(path, "rb") as reader:
+        mapped = hash_mapped(reader, algorithm)
+    assert mapped == hash_stream(io.BytesIO(DATA), algorithm)
+    with patch("hash_stream.MMAP_SIZE", 1):
+        assert hash_file(path, algorithm) == mapped
+
+def test_cache_uses_chosen_algorithm(fs):
+    fs.create_dir("/cache")
+    fs.create_file("test.txt", contents="xyz")
+    cache = CacheFilesystem(IndexCSV("/cache"), "/cache")
+    cache.HASH_ALGORITHM = "blake2b"
+    assert cache.add("test.txt") == hashlib.blake2b(b"xyz").hexdigest()
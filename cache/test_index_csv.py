@@ -42,3 +42,13 @@ def test_csv_has_entry(disk):
     assert index.has("abcd1234")
     assert not index.has("dcba4321")
 # mccole:/check
+
+def test_csv_add_many(disk):
+    right_now = datetime(2022, 12, 12)
+    index = IndexCSV(CACHE_DIR)
+    with patch("index_base.current_time", return_value=right_now):
+        index.add_many(["abcd1234", "dcba4321"])
+    assert index.load() == [
+        CacheEntry("abcd1234", right_now),
+        CacheEntry("dcba4321", right_now),
+    ]
@@ -0,0 +1,66 @@
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from index_base import CacheEntry
+from index_log import IndexLog
+
+CACHE_DIR = Path("/cache")
+INDEX_FILE = Path(CACHE_DIR, IndexLog.INDEX_FILE)
+
+@pytest.fixture
+def disk(fs):
+    fs.create_dir(CACHE_DIR)
+
+def count_lines():
+    with open(INDEX_FILE, "r") as reader:
+        return len(reader.readlines())
+
+def test_log_loads_initially(disk):
+    index = IndexLog(CACHE_DIR)
+    assert index.load() == []
+    assert index.known() == set()
+
+def test_log_saves_changes(disk):
+    right_now = datetime(2022, 12, 12)
+    index = IndexLog(CACHE_DIR)
+    with patch("index_log.current_time", return_value=right_now):
+        index.add("abcd1234")
+    assert index.load() == [CacheEntry("abcd1234", right_now)]
+    assert index.known() == {"abcd1234"}
+
+def test_log_has_entry(disk):
+    index = IndexLog(CACHE_DIR)
+    index.add("abcd1234")
+    assert index.has("abcd1234")
+    assert not index.has("dcba4321")
+
+def test_log_appends_without_rewriting(disk):
+    index = IndexLog(CACHE_DIR)
+    index.add("abcd1234")
+    index.add("dcba4321")
+    assert count_lines() == 2
+
+def test_log_rebuilt_on_startup(disk):
+    right_now = datetime(2022, 12, 12)
+    first = IndexLog(CACHE_DIR)
+    with patch("index_log.current_time", return_value=right_now):
+        first.add("abcd1234")
+        first.add("dcba4321")
+    second = IndexLog(CACHE_DIR)
+    assert second.known() == {"abcd1234", "dcba4321"}
+    assert CacheEntry("abcd1234", right_now) in second.load()
+
+def test_log_compacts_duplicates(disk):
+    index = IndexLog(CACHE_DIR)
+    for i in range(IndexLog.COMPACT_MIN):
+        index.add("abcd1234")
+    assert count_lines() == 1
+    assert index.known() == {"abcd1234"}
+
+def test_log_add_many(disk):
+    index = IndexLog(CACHE_DIR)
+    index.add_many(["abcd1234", "dcba4321"])
+    assert index.known() == {"abcd1234", "dcba4321"}
+    assert count_lines() == 2
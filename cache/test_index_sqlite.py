@@ -0,0 +1,50 @@
+from datetime import datetime
+from unittest.mock import patch
+import pytest
+
+from index_base import CacheEntry
+from index_sqlite import IndexSQLite
+
+@pytest.fixture
+def index(tmp_path):
+    index = IndexSQLite(tmp_path)
+    yield index
+    index.close()
+
+def test_sqlite_loads_initially(index):
+    assert index.load() == []
+    assert index.known() == set()
+
+def test_sqlite_saves_changes(index):
+    right_now = datetime(2022, 12, 12)
+    with patch("index_sqlite.current_time", return_value=right_now):
+        index.add("abcd1234")
+    assert index.load() == [CacheEntry("abcd1234", right_now)]
+    assert index.known() == {"abcd1234"}
+
+def test_sqlite_has_entry(index):
+    index.add("abcd1234")
+    assert index.has("abcd1234")
+    assert not index.has("dcba4321")
+
+def test_sqlite_duplicates_stored_once(index):
+    index.add("abcd1234")
+    index.add("abcd1234")
+    assert len(index.load()) == 1
+
+def test_sqlite_add_many(index):
+    idents = [f"ident{i}" for i in range(10)]
+    index.add_many(idents)
+    assert index.known() == set(idents)
+
+def test_sqlite_save_replaces_everything(index):
+    index.add("abcd1234")
+    entry = CacheEntry("dcba4321", datetime(2022, 12, 12))
+    index.save([entry])
+    assert index.load() == [entry]
+
+def test_sqlite_visible_to_second_reader(tmp_path, index):
+    index.add("abcd1234")
+    reader = IndexSQLite(tmp_path)
+    assert reader.has("abcd1234")
+    reader.close()
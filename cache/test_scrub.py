@@ -0,0 +1,128 @@
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+
+from cache_evicting import CacheEvicting
+from cache_filesystem import CacheFilesystem
+from cache_limited import CacheLimited
+from index_csv import IndexCSV
+from scrub import RateLimiter, Scrubber
+
+CACHE_DIR = Path("/cache")
+ARCHIVE_DIR = Path("/archive")
+QUARANTINE_DIR = Path("/quarantine")
+LOCAL_LIMIT = 10
+
+@pytest.fixture
+def disk(fs):
+    fs.create_dir(CACHE_DIR)
+    fs.create_dir(ARCHIVE_DIR)
+    return fs
+
+@pytest.fixture
+def cache(disk):
+    return CacheLimited(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                        LOCAL_LIMIT)
+
+def add_files(disk, cache, names):
+    idents = {}
+    for name in names:
+        disk.create_file(f"{name}.txt", contents=name * 3)
+        idents[name] = cache.add(f"{name}.txt")
+    return idents
+
+def damage(cache, identifier):
+    cache._make_cache_path(identifier).write_text("damaged")
+
+def test_scrub_clean_cache(disk, cache):
+    add_files(disk, cache, "abc")
+    result = Scrubber(cache, QUARANTINE_DIR).run()
+    assert result == {"checked": 3, "corrupt": [], "repaired": []}
+
+def test_scrub_repairs_from_archive(disk, cache):
+    idents = add_files(disk, cache, "abc")
+    damage(cache, idents["b"])
+    result = Scrubber(cache, QUARANTINE_DIR, workers=2).run()
+    assert result["corrupt"] == [idents["b"]]
+    assert result["repaired"] == [idents["b"]]
+    assert cache.get_cache_path(idents["b"]).read_text() == "bbb"
+    quarantined = Path(QUARANTINE_DIR, cache._make_cache_path(idents["b"]).name)
+    assert quarantined.read_text() == "damaged"
+
+def test_scrub_without_archive_only_quarantines(disk):
+    cache = CacheFilesystem(IndexCSV(CACHE_DIR), CACHE_DIR)
+    idents = add_files(disk, cache, "ab")
+    damage(cache, idents["a"])
+    result = Scrubber(cache, QUARANTINE_DIR).run()
+    assert result["corrupt"] == [idents["a"]]
+    assert result["repaired"] == []
+    assert not cache._make_cache_path(idents["a"]).exists()
+
+def test_scrub_damaged_archive_not_used(disk, cache):
+    idents = add_files(disk, cache, "a")
+    damage(cache, idents["a"])
+    cache._make_archive_path(idents["a"]).write_text("also damaged")
+    result = Scrubber(cache, QUARANTINE_DIR).run()
+    assert result["repaired"] == []
+    assert list(CACHE_DIR.iterdir()) == []
+
+def test_scrub_evicting_forgets_unrepairable(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    idents = add_files(disk, cache, "ab")
+    damage(cache, idents["a"])
+    cache._make_archive_path(idents["a"]).unlink()
+    result = Scrubber(cache, QUARANTINE_DIR).run()
+    assert result["repaired"] == []
+    stats = cache.get_stats()
+    assert stats["files"] == 1
+    assert stats["bytes"] == 3
+    assert stats["evictions"] == 0
+    assert cache.policy.identifiers() == {idents["b"]}
+
+def test_scrub_evicting_keeps_repaired(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    idents = add_files(disk, cache, "ab")
+    damage(cache, idents["a"])
+    result = Scrubber(cache, QUARANTINE_DIR).run()
+    assert result["repaired"] == [idents["a"]]
+    assert cache.get_stats()["files"] == 2
+    assert cache.get_stats()["bytes"] == 6
+    cache.get_cache_path(idents["a"])
+    assert cache.get_stats()["hits"] == 1
+
+def test_scrub_waits_for_cache_lock(disk):
+    cache = CacheEvicting(IndexCSV(ARCHIVE_DIR), CACHE_DIR, ARCHIVE_DIR,
+                          LOCAL_LIMIT)
+    idents = add_files(disk, cache, "ab")
+    damage(cache, idents["a"])
+    scrubber = Scrubber(cache, QUARANTINE_DIR)
+    with cache.lock:
+        scrubber.start()
+        scrubber._thread.join(timeout=0.2)
+        assert scrubber._thread.is_alive()
+        assert cache._make_cache_path(idents["a"]).read_text() == "damaged"
+    result = scrubber.join()
+    assert result["repaired"] == [idents["a"]]
+    assert cache.get_stats()["files"] == 2
+
+def test_scrub_in_background(disk, cache):
+    idents = add_files(disk, cache, "abc")
+    damage(cache, idents["c"])
+    scrubber = Scrubber(cache, QUARANTINE_DIR, rate=1_000_000)
+    scrubber.start()
+    result = scrubber.join()
+    assert result["repaired"] == [idents["c"]]
+
+def test_rate_limiter_paces_reads():
+    clock = [100.0]
+    def sleep(seconds):
+        clock[0] += seconds
+    with patch("scrub.time.monotonic", side_effect=lambda: clock[0]), \
+         patch("scrub.time.sleep", side_effect=sleep) as spy:
+        limiter = RateLimiter(1000)
+        for i in range(3):
+            limiter.wait(500)
+    assert clock[0] == pytest.approx(101.0)
+    assert spy.call_count == 2
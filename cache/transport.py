@@ -0,0 +1,137 @@
+import queue
+import shutil
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.client import HTTPConnection, RemoteDisconnected
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from exceptions import CacheException
+from locking import atomic_copy, atomic_writer
+
+class TransportBase(ABC):
+    @abstractmethod
+    def exists(self, name):
+        """Check whether the archive has an object."""
+
+    @abstractmethod
+    def fetch(self, name, dest_path):
+        """Copy an object from the archive to a local file."""
+
+    @abstractmethod
+    def store(self, source_path, name):
+        """Copy a local file into the archive."""
+
+
+class TransportLocal(TransportBase):
+    def __init__(self, archive_dir):
+        self.archive_dir = Path(archive_dir)
+
+    def exists(self, name):
+        return Path(self.archive_dir, name).exists()
+
+    def fetch(self, name, dest_path):
+        archive_path = Path(self.archive_dir, name)
+        if not archive_path.exists():
+            raise CacheException(f"Archive has no object {name}")
+        atomic_copy(archive_path, dest_path)
+
+    def store(self, source_path, name):
+        shutil.copyfile(source_path, Path(self.archive_dir, name))
+
+
+class TransportHTTP(TransportBase):
+    BLOCK_SIZE = 1024 * 1024  # how much to ask for in each range request
+    POOL_SIZE = 4             # how many idle connections to keep
+    STALE = (RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+    def __init__(self, base_url, block_size=BLOCK_SIZE,
+                 pool_size=POOL_SIZE, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.block_size = block_size
+        self.timeout = timeout
+        self.connections_made = 0
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+
+    def exists(self, name):
+        with self._request("HEAD", name) as response:
+            response.read()
+        return response.status == HTTPStatus.OK
+
+    def fetch(self, name, dest_path):
+        with atomic_writer(dest_path, "wb") as writer:
+            start, total = 0, None
+            while (total is None) or (start < total):
+                end = start + self.block_size - 1
+                total = self._fetch_range(name, start, end, writer)
+                start = end + 1
+
+    def store(self, source_path, name):
+        size = Path(source_path).stat().st_size
+        headers = {"Content-Length": str(size)}
+        with self._request("PUT", name, headers, source_path) as response:
+            response.read()
+        if response.status not in (HTTPStatus.OK, HTTPStatus.CREATED):
+            raise CacheException(f"Unable to store {name}: {response.status}")
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+    def _fetch_range(self, name, start, end, writer):
+        headers = {"Range": f"bytes={start}-{end}"}
+        with self._request("GET", name, headers) as response:
+            if response.status == HTTPStatus.PARTIAL_CONTENT:
+                shutil.copyfileobj(response, writer)
+                return int(response.getheader("Content-Range").split("/")[1])
+            if (response.status == HTTPStatus.OK) and (start == 0):
+                shutil.copyfileobj(response, writer)
+                return 0  # server sent the whole object at once
+            response.read()
+            raise CacheException(f"Archive has no object {name}")
+
+    @contextmanager
+    def _request(self, method, name, headers=None, source_path=None):
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(), False
+        try:
+            try:
+                response = self._send(conn, method, name, headers, source_path)
+            except self.STALE:
+                # The server may have closed an idle keep-alive connection,
+                # so try once more on a new one before giving up.
+                if not reused:
+                    raise
+                conn.close()
+                conn = self._connect()
+                response = self._send(conn, method, name, headers, source_path)
+            yield response
+        except Exception:
+            conn.close()
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _connect(self):
+        self.connections_made += 1
+        return HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _send(self, conn, method, name, headers, source_path):
+        url, headers = self._make_url(name), headers or {}
+        if source_path is None:
+            conn.request(method, url, headers=headers)
+        else:
+            with open(source_path, "rb") as reader:
+                conn.request(method, url, body=reader, headers=headers)
+        return conn.getresponse()
+
+    def _make_url(self, name):
+        return f"{self.prefix}/{name}"
@@ -8,8 +8,11 @@ class Blocked(Database):
     def size():
         return Blocked.RECORDS_PER_BLOCK
 
-    def __init__(self, record_cls):
+    def __init__(self, record_cls, records_per_block=None, block_bytes=None):
         super().__init__(record_cls)
+        self._records_per_block = self._choose_block_size(
+            records_per_block, block_bytes
+        )
         self._next = 0
         self._index = {}
         self._blocks = []
@@ -48,10 +51,33 @@ class Blocked(Database):
         return seq_id
 
     def _get_block_id(self, seq_id):
-        return seq_id // Blocked.RECORDS_PER_BLOCK
+        return seq_id // self._records_per_block
 
     def _get_block(self, block_id):
         while block_id >= len(self._blocks):
             self._blocks.append({})
         return self._blocks[block_id]
     # mccole:/helper
+
+    def block_size(self):
+        return self._records_per_block
+
+    def bulk_load(self, records):
+        for record in records:
+            self.add(record)
+
+    def scan(self):
+        for block in self._blocks:
+            for (seq_id, record) in list(block.items()):
+                if self._index[self._record_cls.key(record)] == seq_id:
+                    yield record
+
+    def _choose_block_size(self, records_per_block, block_bytes):
+        assert (records_per_block is None) or (block_bytes is None), \
+            "give block size in records or bytes, not both"
+        if block_bytes is not None:
+            records_per_block = block_bytes // self._record_cls.size()
+        if records_per_block is None:
+            records_per_block = self.RECORDS_PER_BLOCK
+        assert records_per_block > 0, "blocks must hold at least one record"
+        return records_per_block
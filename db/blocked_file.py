@@ -1,12 +1,23 @@
+import json
+import os
+import shutil
+import threading
 from pathlib import Path
 
 from blocked import Blocked
 
 # mccole:class
 class BlockedFile(Blocked):
-    def __init__(self, record_cls, db_dir):
-        super().__init__(record_cls)
+    META_FILE = "blocks.json"
+
+    def __init__(self, record_cls, db_dir,
+                 records_per_block=None, block_bytes=None):
+        super().__init__(record_cls, records_per_block, block_bytes)
         self._db_dir = Path(db_dir)
+        self._blocks_lock = threading.Lock()
+        self._recover_compaction()
+        explicit = (records_per_block is not None) or (block_bytes is not None)
+        self._check_block_size(explicit)
         self._build_index()
 
     def add(self, record):
@@ -30,8 +41,8 @@ class BlockedFile(Blocked):
         packed = self._record_cls.pack_multi(block.values())
 
         filename = self._get_filename(block_id)
-        with open(filename, "w") as writer:
-            writer.write(''.join(packed))
+        with open(filename, self._file_mode("w")) as writer:
+            writer.write(packed)
     # mccole:/save
 
     # mccole:load
@@ -42,28 +53,168 @@ class BlockedFile(Blocked):
         self._load_block(block_id, filename)
 
     def _load_block(self, block_id, filename):
-        with open(filename, "r") as reader:
+        with open(filename, self._file_mode("r")) as reader:
             raw = reader.read()
 
         records = self._record_cls.unpack_multi(raw)
-        base = self.size() * block_id
+        base = self.block_size() * block_id
         block = self._get_block(block_id)
         for i, r in enumerate(records):
             block[base + i] = r
     # mccole:/load
 
+    def bulk_load(self, records):
+        # Fill blocks in memory and write each one once it is full
+        # instead of rewriting the current block for every record,
+        # then drop it so that memory use doesn't grow with the load.
+        current = None
+        for record in records:
+            super().add(record)
+            key = self._record_cls.key(record)
+            block_id = self._get_block_id(self._index[key])
+            if (current is not None) and (block_id != current):
+                self._save_block(current)
+                self._blocks[current] = {}
+            current = block_id
+        if current is not None:
+            self._save_block(current)
+
+    def scan(self):
+        return self._scan_blocks(self._block_ids())
+
+    def _scan_blocks(self, block_ids):
+        for block_id in block_ids:
+            filename = self._get_filename(block_id)
+            with open(filename, self._file_mode("r")) as reader:
+                records = self._record_cls.unpack_multi(reader.read())
+            base = self.block_size() * block_id
+            for (i, record) in enumerate(records):
+                if self._index[self._record_cls.key(record)] == base + i:
+                    yield record
+
+    def compact(self, records_per_block=None, block_bytes=None):
+        # Leading blocks that are full of live records are kept as they
+        # are; the rest are streamed into full blocks in a new directory,
+        # which is then swapped in place of the old one.
+        size = self._records_per_block
+        if (records_per_block is not None) or (block_bytes is not None):
+            size = self._choose_block_size(records_per_block, block_bytes)
+        new_dir = Path(f"{self._db_dir}.compact")
+        old_dir = Path(f"{self._db_dir}.old")
+        if new_dir.exists():
+            shutil.rmtree(new_dir)  # left by a compaction that crashed
+        new_dir.mkdir()
+        self._save_meta(new_dir, size)
+        block_ids = self._block_ids()
+        keep = 0
+        if size == self.block_size():
+            keep = self._dense_prefix(block_ids)
+        for block_id in block_ids[:keep]:
+            filename = self._get_filename(block_id)
+            os.link(filename, new_dir.joinpath(filename.name))
+        block, block_id = [], keep
+        for record in self._scan_blocks(block_ids[keep:]):
+            block.append(record)
+            if len(block) == size:
+                self._write_compacted(new_dir, block_id, block)
+                block, block_id = [], block_id + 1
+        if block:
+            self._write_compacted(new_dir, block_id, block)
+        self._db_dir.rename(old_dir)
+        new_dir.rename(self._db_dir)
+        shutil.rmtree(old_dir)
+        self._records_per_block = size
+        self._index, self._blocks = {}, []
+        self._build_index()
+        self._next = len(self._index)
+
+    def _dense_prefix(self, block_ids):
+        # Count the leading blocks whose every slot holds a live record.
+        live = set(self._index.values())
+        size = self.block_size()
+        for (i, block_id) in enumerate(block_ids):
+            first = block_id * size
+            if (block_id != i) or \
+               not all(s in live for s in range(first, first + size)):
+                return i
+        return len(block_ids)
+
+    def _recover_compaction(self):
+        # A crash while swapping directories can leave the database
+        # only in the old directory, or leave a stale copy of it there.
+        old_dir = Path(f"{self._db_dir}.old")
+        if not old_dir.exists():
+            return
+        if self._db_dir.exists():
+            shutil.rmtree(old_dir)
+        else:
+            old_dir.rename(self._db_dir)
+
+    def _write_compacted(self, new_dir, block_id, records):
+        filename = new_dir.joinpath(self._get_filename(block_id).name)
+        with open(filename, self._file_mode("w")) as writer:
+            writer.write(self._record_cls.pack_multi(records))
+
+    def _check_block_size(self, explicit):
+        meta_path = self._db_dir.joinpath(self.META_FILE)
+        if not meta_path.exists():
+            # Databases written before block sizes were configurable
+            # used the default size and have no metadata file.
+            stored = self.RECORDS_PER_BLOCK if self._block_ids() \
+                else self._records_per_block
+            if explicit:
+                assert stored == self._records_per_block, \
+                    f"database has {stored} records per block"
+            self._save_meta(self._db_dir, stored)
+            self._records_per_block = stored
+            return
+        with open(meta_path, "r") as reader:
+            stored = json.load(reader)["records_per_block"]
+        if explicit:
+            assert stored == self._records_per_block, \
+                f"database has {stored} records per block"
+        self._records_per_block = stored
+
+    def _save_meta(self, db_dir, records_per_block):
+        with open(db_dir.joinpath(self.META_FILE), "w") as writer:
+            json.dump({"records_per_block": records_per_block}, writer)
+
+    def _block_ids(self):
+        return sorted(int(f.stem) for f in self._db_dir.glob("*.db"))
+
+    def _save_block(self, block_id):
+        block = self._get_block(block_id)
+        packed = self._record_cls.pack_multi(block.values())
+        filename = self._get_filename(block_id)
+        with open(filename, self._file_mode("w")) as writer:
+            writer.write(packed)
+
+    def _get_block(self, block_id):
+        # Readers sharing the database may load blocks at the same time,
+        # and growing the list of blocks isn't safe to do concurrently.
+        with self._blocks_lock:
+            return super()._get_block(block_id)
+
     def _get_filename(self, block_id):
         return self._db_dir.joinpath(f"{block_id:04}.db")
 
     # mccole:index
     def _build_index(self):
+        # Only keep the last block, which new records are added to,
+        # so opening a database doesn't read every block into memory.
         seq_id = 0
-        for (block_id, filename) in enumerate(
-                sorted(self._db_dir.iterdir())
-        ):
-            self._load_block(block_id, filename)
-            for record in self._get_block(block_id).values():
+        block_ids = self._block_ids()
+        for block_id in block_ids:
+            filename = self._get_filename(block_id)
+            with open(filename, self._file_mode("r")) as reader:
+                records = self._record_cls.unpack_multi(reader.read())
+            for record in records:
                 key = self._record_cls.key(record)
                 self._index[key] = seq_id
                 seq_id += 1
+            self._get_block(block_id)
+        self._next = seq_id
+        if block_ids:
+            last = block_ids[-1]
+            self._load_block(last, self._get_filename(last))
     # mccole:/index
@@ -0,0 +1,79 @@
+from blocked_file import BlockedFile
+from buffer_pool import BufferPool
+
+class BlockedFilePooled(BlockedFile):
+    POOL_SIZE = 64
+
+    def __init__(self, record_cls, db_dir, pool_size=None, **options):
+        self._pool = BufferPool(
+            pool_size or self.POOL_SIZE, self._read_block, self._write_block
+        )
+        self._num_blocks = 0
+        super().__init__(record_cls, db_dir, **options)
+
+    def num_blocks(self):
+        return self._num_blocks
+
+    def get_stats(self):
+        return {**self._pool.stats, "hit_rate": self._pool.hit_rate()}
+
+    def bulk_load(self, records):
+        # The pool writes each block back when it is evicted or flushed,
+        # so blocks only need to be marked dirty as they fill.
+        for record in records:
+            self.add(record)
+        self.flush()
+
+    def scan(self):
+        self.flush()
+        return super().scan()
+
+    def compact(self, **options):
+        self.flush()
+        super().compact(**options)
+        self._pool.clear()
+
+    def flush(self):
+        self._pool.flush()
+
+    def close(self):
+        self.flush()
+
+    def _save(self, record):
+        seq_id = self._index[self._record_cls.key(record)]
+        self._pool.mark_dirty(self._get_block_id(seq_id))
+
+    def _load(self, key):
+        pass  # the pool reads blocks on demand in _get_block
+
+    def _get_block(self, block_id):
+        with self._blocks_lock:
+            self._num_blocks = max(self._num_blocks, block_id + 1)
+        return self._pool.get(block_id)
+
+    def _read_block(self, block_id):
+        filename = self._get_filename(block_id)
+        if not filename.exists():
+            return {}
+        with open(filename, self._file_mode("r")) as reader:
+            records = self._record_cls.unpack_multi(reader.read())
+        base = self.block_size() * block_id
+        return {base + i: r for (i, r) in enumerate(records)}
+
+    def _write_block(self, block_id, block):
+        packed = self._record_cls.pack_multi(block.values())
+        filename = self._get_filename(block_id)
+        with open(filename, self._file_mode("w")) as writer:
+            writer.write(packed)
+
+    def _build_index(self):
+        # Read each block once to find its keys without keeping it,
+        # so opening the database doesn't fill the pool.
+        seq_id = 0
+        block_ids = self._block_ids()
+        for block_id in block_ids:
+            for record in self._read_block(block_id).values():
+                self._index[self._record_cls.key(record)] = seq_id
+                seq_id += 1
+        self._num_blocks = len(block_ids)
+        self._next = seq_id
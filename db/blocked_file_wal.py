@@ -0,0 +1,83 @@
+from blocked import Blocked
+from blocked_file import BlockedFile
+from wal import WriteAheadLog, replace_atomically
+
+class BlockedFileWAL(BlockedFile):
+    LOG_SUFFIX = ".wal"
+
+    def __init__(self, record_cls, db_dir,
+                 records_per_block=None, block_bytes=None, **options):
+        self._dirty = set()
+        super().__init__(record_cls, db_dir, records_per_block, block_bytes)
+        # The log lives beside the directory so that compacting,
+        # which replaces the directory, leaves it alone.
+        self._wal = WriteAheadLog(
+            f"{self._db_dir}{self.LOG_SUFFIX}", record_cls,
+            self._snapshot, self._checkpoint, **options
+        )
+        self._wal.recover(self._replay)
+
+    def add(self, record):
+        with self._wal.lock:
+            self._apply(record)
+            seq_id = self._index[self._record_cls.key(record)]
+            self._wal.append(record, seq_id)
+
+    def bulk_load(self, records):
+        for record in records:
+            self.add(record)
+
+    def scan(self):
+        # Block files lag behind the log, but every block is in memory.
+        return Blocked.scan(self)
+
+    def compact(self, **options):
+        self._wal.checkpoint()
+        with self._wal.lock:
+            super().compact(**options)
+
+    def sync(self):
+        self._wal.sync()
+
+    def close(self):
+        self._wal.close()
+
+    def _apply(self, record):
+        super().add(record)
+
+    def _replay(self, seq_id, record):
+        # Put the record back where it was first stored rather than
+        # giving it a new sequence ID, so replaying is idempotent.
+        self._index[self._record_cls.key(record)] = seq_id
+        block_id = self._get_block_id(seq_id)
+        self._get_block(block_id)[seq_id] = record
+        self._next = max(self._next, seq_id + 1)
+        self._dirty.add(block_id)
+
+    def _save(self, record):
+        seq_id = self._index[self._record_cls.key(record)]
+        self._dirty.add(self._get_block_id(seq_id))
+
+    def _load(self, key):
+        pass  # every block is already in memory
+
+    def _build_index(self):
+        super()._build_index()
+        for block_id in range(self.num_blocks()):
+            self._load_block(block_id, self._get_filename(block_id))
+
+    def _snapshot(self):
+        packed = {
+            block_id: self._record_cls.pack_multi(
+                r for (_, r) in sorted(self._get_block(block_id).items())
+            )
+            for block_id in self._dirty
+        }
+        self._dirty = set()
+        return packed
+
+    def _checkpoint(self, packed):
+        for (block_id, data) in sorted(packed.items()):
+            replace_atomically(
+                self._get_filename(block_id), data, self._file_mode("w")
+            )
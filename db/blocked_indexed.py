@@ -0,0 +1,111 @@
+from blocked_file import BlockedFile
+from secondary import SortedIndex, fields_for
+
+class BlockedIndexed(BlockedFile):
+    def __init__(self, record_cls, db_dir, indexes=(), fields=None,
+                 **options):
+        self._fields = fields if fields is not None else fields_for(record_cls)
+        assert all(name in self._fields for name in indexes), \
+            f"unknown field in {indexes}"
+        self._secondary = {name: SortedIndex() for name in indexes}
+        super().__init__(record_cls, db_dir, **options)
+
+    def add(self, record):
+        key = self._record_cls.key(record)
+        old = self.get(key)
+        if old is not None:
+            self._remove_secondary(old)
+        super().add(record)
+        self._add_secondary(record)
+
+    def bulk_load(self, records):
+        super().bulk_load(self._track(records))
+
+    def query(self, *predicates):
+        _, candidates = self._plan(predicates)
+        for record in candidates:
+            if all(self._matches(p, record) for p in predicates):
+                yield record
+
+    def explain(self, *predicates):
+        plan, _ = self._plan(predicates)
+        return plan
+
+    def _track(self, records):
+        for record in records:
+            old = self._find_replaced(self._record_cls.key(record))
+            if old is not None:
+                self._remove_secondary(old)
+            yield record
+            self._add_secondary(record)
+
+    def _find_replaced(self, key):
+        # The block being bulk loaded may not be saved yet, so look in
+        # memory first; blocks that have been saved were dropped.
+        if key not in self._index:
+            return None
+        seq_id = self._index[key]
+        block = self._get_block(self._get_block_id(seq_id))
+        return block[seq_id] if seq_id in block else self.get(key)
+
+    def _plan(self, predicates):
+        for p in predicates:
+            if p.field in self._secondary:
+                keys = p.lookup(self._secondary[p.field])
+                return f"index {p.field}", self._fetch(keys)
+        return "scan", self.scan()
+
+    def _fetch(self, keys):
+        seen = set()
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                yield self.get(key)
+
+    def _matches(self, predicate, record):
+        assert predicate.field in self._fields, \
+            f"unknown field {predicate.field}"
+        return predicate.matches(self._fields[predicate.field].values(record))
+
+    def _build_index(self):
+        # Rebuild the secondary indexes in the same pass over the blocks
+        # as the primary index, then sort each of them just once.
+        found = {name: [] for name in self._secondary}
+        seq_id = 0
+        block_ids = self._block_ids()
+        for block_id in block_ids:
+            filename = self._get_filename(block_id)
+            with open(filename, self._file_mode("r")) as reader:
+                records = self._record_cls.unpack_multi(reader.read())
+            for record in records:
+                key = self._record_cls.key(record)
+                self._index[key] = seq_id
+                for (name, entries) in found.items():
+                    for value in self._fields[name].values(record):
+                        entries.append((value, key, seq_id))
+                seq_id += 1
+            self._get_block(block_id)
+        self._next = seq_id
+        if block_ids:
+            last = block_ids[-1]
+            self._load_block(last, self._get_filename(last))
+        # Only keep entries for the live copy of each record.
+        self._secondary = {
+            name: SortedIndex(
+                (value, key) for (value, key, seq_id) in entries
+                if self._index[key] == seq_id
+            )
+            for (name, entries) in found.items()
+        }
+
+    def _add_secondary(self, record):
+        key = self._record_cls.key(record)
+        for (name, index) in self._secondary.items():
+            for value in self._fields[name].values(record):
+                index.add(value, key)
+
+    def _remove_secondary(self, record):
+        key = self._record_cls.key(record)
+        for (name, index) in self._secondary.items():
+            for value in self._fields[name].values(record):
+                index.remove(value, key)
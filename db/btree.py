@@ -0,0 +1,314 @@
+import re
+import struct
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from mapped_file import MappedFile
+
+Node = namedtuple("Node", ["leaf", "keys", "values", "next"])
+
+class BTree:
+    PAGE_SIZE = 4096
+    INITIAL_PAGES = 16
+    MAGIC = b"SDXTREE\0"
+    HEADER = struct.Struct("<8sIIQ")      # magic, root, pages in use, count
+    NODE_HEADER = struct.Struct("<BHI")   # is leaf, keys in use, next leaf
+    CHILD = struct.Struct("<I")
+
+    def __init__(self, filename, key_format, value_format="Q"):
+        self._key = struct.Struct(f"<{key_format}")
+        self._value = struct.Struct(f"<{value_format}")
+        self._key_widths = self._string_widths(key_format)
+        self._value_fields = len(self._value.unpack(bytes(self._value.size)))
+        space = self.PAGE_SIZE - self.NODE_HEADER.size
+        self._leaf_cap = space // (self._key.size + self._value.size)
+        self._inner_cap = \
+            (space - self.CHILD.size) // (self._key.size + self.CHILD.size)
+        assert min(self._leaf_cap, self._inner_cap) >= 3, "keys too large"
+        self._file = MappedFile(filename, self.INITIAL_PAGES * self.PAGE_SIZE)
+        if self._file.created:
+            self._pages_used, self._count = 1, 0  # page 0 holds the header
+            self._root = self._new_page()
+            self._write(self._root, Node(True, [], [], 0))
+            self._save_header()
+        else:
+            magic, self._root, self._pages_used, self._count = \
+                self._file.unpack_from(self.HEADER, 0)
+            assert magic == self.MAGIC, f"{filename} is not a B-tree"
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key):
+        page = self._find_leaf(key)
+        i = self._bisect(page, key, bisect_left)
+        if (i < self._num_keys(page)) and (self._key_at(page, i) == key):
+            return self._value_at(page, i)
+        return None
+
+    def put(self, key, *value):
+        key, value = self._check_key(key), self._check_value(value)
+        split = self._insert(self._root, key, value)
+        if split is not None:
+            separator, right = split
+            root = self._new_page()
+            self._write(root, Node(False, [separator], [self._root, right], 0))
+            self._root = root
+        self._save_header()
+
+    def remove(self, key):
+        # Leaves are allowed to underflow rather than being merged:
+        # lookups and scans stay correct and deleting is rare here.
+        page = self._find_leaf(key)
+        node = self._read(page)
+        i = bisect_left(node.keys, key)
+        if (i == len(node.keys)) or (node.keys[i] != key):
+            return False
+        del node.keys[i]
+        del node.values[i]
+        self._write(page, node)
+        self._count -= 1
+        self._save_header()
+        return True
+
+    def items(self, low=None, high=None):
+        page = self._find_leaf(low)
+        while page:
+            node = self._read(page)
+            start = 0 if low is None else bisect_left(node.keys, low)
+            for i in range(start, len(node.keys)):
+                if (high is not None) and (node.keys[i] >= high):
+                    return
+                yield node.keys[i], node.values[i]
+            page, low = node.next, None
+
+    def bulk_load(self, items):
+        assert self._count == 0, "can only bulk load an empty tree"
+        level = self._load_leaves(items)
+        while len(level) > 1:
+            level = self._load_inner(level)
+        self._root = level[0][1]
+        self._save_header()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _load_leaves(self, items):
+        level, keys, values, last = [], [], [], None
+        for key, value in items:
+            assert (last is None) or (last < key), "keys must be sorted"
+            keys.append(self._check_key(key))
+            values.append(self._check_value(value))
+            last = key
+            if len(keys) == self._leaf_cap:
+                self._add_leaf(level, keys, values)
+                keys, values = [], []
+        if keys or (not level):
+            self._add_leaf(level, keys, values)
+        return level
+
+    def _add_leaf(self, level, keys, values):
+        if level:
+            page = self._new_page()
+            self._link(level[-1][1], page)
+        else:
+            page = self._root
+        self._write(page, Node(True, keys, values, 0))
+        self._count += len(keys)
+        level.append((keys[0] if keys else None, page))
+
+    def _load_inner(self, level):
+        result = []
+        for start in range(0, len(level), self._inner_cap + 1):
+            chunk = level[start:start + self._inner_cap + 1]
+            keys = [key for (key, _) in chunk[1:]]
+            children = [page for (_, page) in chunk]
+            page = self._new_page()
+            self._write(page, Node(False, keys, children, 0))
+            result.append((chunk[0][0], page))
+        return result
+
+    def _link(self, page, next_page):
+        node = self._read(page)
+        self._write(page, node._replace(next=next_page))
+
+    def _find_leaf(self, key):
+        # Binary search the mapped keys in place instead of decoding
+        # whole nodes so that lookups only touch a few entries per level.
+        page = self._root
+        while True:
+            leaf, _, _ = self._file.unpack_from(
+                self.NODE_HEADER, page * self.PAGE_SIZE
+            )
+            if leaf:
+                return page
+            i = 0 if key is None else self._bisect(page, key, bisect_right)
+            page = self._child_at(page, i)
+
+    def _bisect(self, page, key, search):
+        return search(
+            range(self._num_keys(page)), key,
+            key=lambda i: self._key_at(page, i)
+        )
+
+    def _num_keys(self, page):
+        _, num, _ = self._file.unpack_from(
+            self.NODE_HEADER, page * self.PAGE_SIZE
+        )
+        return num
+
+    def _key_at(self, page, i):
+        offset = page * self.PAGE_SIZE + self.NODE_HEADER.size \
+            + i * self._key.size
+        return self._decode(self._file.unpack_from(self._key, offset))
+
+    def _child_at(self, page, i):
+        offset = self._values_offset(page, False) + i * self.CHILD.size
+        (child,) = self._file.unpack_from(self.CHILD, offset)
+        return child
+
+    def _value_at(self, page, i):
+        offset = self._values_offset(page, True) + i * self._value.size
+        value = self._file.unpack_from(self._value, offset)
+        return value if len(value) > 1 else value[0]
+
+    def _values_offset(self, page, leaf):
+        cap = self._leaf_cap if leaf else self._inner_cap
+        return page * self.PAGE_SIZE + self.NODE_HEADER.size \
+            + cap * self._key.size
+
+    def _insert(self, page, key, value):
+        node = self._read(page)
+        if node.leaf:
+            i = bisect_left(node.keys, key)
+            if (i < len(node.keys)) and (node.keys[i] == key):
+                node.values[i] = value
+                self._write(page, node)
+                return None
+            node.keys.insert(i, key)
+            node.values.insert(i, value)
+            self._count += 1
+            if len(node.keys) <= self._leaf_cap:
+                self._write(page, node)
+                return None
+            mid = len(node.keys) // 2
+            right = self._new_page()
+            self._write(right, Node(
+                True, node.keys[mid:], node.values[mid:], node.next
+            ))
+            self._write(page, Node(
+                True, node.keys[:mid], node.values[:mid], right
+            ))
+            return node.keys[mid], right
+
+        i = bisect_right(node.keys, key)
+        split = self._insert(node.values[i], key, value)
+        if split is None:
+            return None
+        separator, child = split
+        node.keys.insert(i, separator)
+        node.values.insert(i + 1, child)
+        if len(node.keys) <= self._inner_cap:
+            self._write(page, node)
+            return None
+        mid = len(node.keys) // 2
+        right = self._new_page()
+        self._write(right, Node(
+            False, node.keys[mid + 1:], node.values[mid + 1:], 0
+        ))
+        self._write(page, Node(
+            False, node.keys[:mid], node.values[:mid + 1], 0
+        ))
+        return node.keys[mid], right
+
+    def _read(self, page):
+        offset = page * self.PAGE_SIZE
+        leaf, num, next_page = self._file.unpack_from(self.NODE_HEADER, offset)
+        offset += self.NODE_HEADER.size
+        mem = self._file.mem
+        end = offset + num * self._key.size
+        raw = self._key.iter_unpack(mem[offset:end])
+        keys = [self._decode(k) for k in raw]
+        offset = self._values_offset(page, leaf)
+        if leaf:
+            end = offset + num * self._value.size
+            values = [
+                v if len(v) > 1 else v[0]
+                for v in self._value.iter_unpack(mem[offset:end])
+            ]
+        else:
+            end = offset + (num + 1) * self.CHILD.size
+            values = [c for (c,) in self.CHILD.iter_unpack(mem[offset:end])]
+        return Node(bool(leaf), keys, values, next_page)
+
+    def _write(self, page, node):
+        offset = page * self.PAGE_SIZE
+        self._file.pack_into(
+            self.NODE_HEADER, offset, node.leaf, len(node.keys), node.next
+        )
+        offset += self.NODE_HEADER.size
+        packed = (self._key.pack(*self._encode(k)) for k in node.keys)
+        self._file.write(offset, b"".join(packed))
+        offset = self._values_offset(page, node.leaf)
+        if node.leaf:
+            packed = (
+                self._value.pack(*(v if isinstance(v, tuple) else (v,)))
+                for v in node.values
+            )
+        else:
+            packed = (self.CHILD.pack(c) for c in node.values)
+        self._file.write(offset, b"".join(packed))
+
+    def _new_page(self):
+        page = self._pages_used
+        self._pages_used += 1
+        needed = self._pages_used * self.PAGE_SIZE
+        if needed > self._file.size():
+            self._file.grow(max(needed, 2 * self._file.size()))
+        return page
+
+    def _check_key(self, key):
+        self._encode(key)
+        return key
+
+    def _check_value(self, value):
+        if not isinstance(value, tuple):
+            value = (value,)
+        assert len(value) == self._value_fields, f"bad value {value}"
+        return value if len(value) > 1 else value[0]
+
+    def _encode(self, key):
+        fields = key if isinstance(key, tuple) else (key,)
+        result = []
+        for (f, width) in zip(fields, self._key_widths):
+            if width is not None:
+                f = f.encode("utf-8")
+                assert len(f) <= width, f"key {key} too long"
+            result.append(f)
+        return result
+
+    def _decode(self, fields):
+        fields = [
+            f if width is None else f.rstrip(b"\0").decode("utf-8")
+            for (f, width) in zip(fields, self._key_widths)
+        ]
+        return tuple(fields) if len(fields) > 1 else fields[0]
+
+    def _save_header(self):
+        self._file.pack_into(
+            self.HEADER, 0, self.MAGIC, self._root,
+            self._pages_used, self._count
+        )
+
+    @staticmethod
+    def _string_widths(key_format):
+        result = []
+        for (count, code) in re.findall(r"(\d*)([a-zA-Z?])", key_format):
+            if code == "s":
+                result.append(int(count or 1))
+            elif code != "x":
+                result.extend([None] * int(count or 1))
+        return result
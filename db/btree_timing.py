@@ -0,0 +1,84 @@
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from btree import BTree
+from record import Experiment
+
+LOOKUPS = 1000
+RANGE_FRACTION = 0.01
+DATA_FILE = "records.db"
+INDEX_FILE = "index.tree"
+
+def make_names(num):
+    return [f"{i:06x}" for i in range(num)]
+
+def write_records(db_dir, names):
+    records = (Experiment(n, i, [i % 10]) for (i, n) in enumerate(names))
+    with open(Path(db_dir, DATA_FILE), "w") as writer:
+        writer.write(Experiment.pack_multi(records))
+
+def time_dict(db_dir, probes, low, high):
+    start = time.time()
+    with open(Path(db_dir, DATA_FILE), "r") as reader:
+        records = Experiment.unpack_multi(reader.read())
+    index = {Experiment.key(r): i for (i, r) in enumerate(records)}
+    opened = time.time()
+    for name in probes:
+        assert name in index
+    looked = time.time()
+    found = [k for k in sorted(index) if low <= k < high]
+    end = time.time()
+    return opened - start, looked - opened, end - looked, len(found)
+
+def time_tree(db_dir, names, probes, low, high):
+    filename = Path(db_dir, INDEX_FILE)
+    start = time.time()
+    tree = BTree(filename, f"{Experiment.MAX_NAME_LEN}s")
+    tree.bulk_load((n, i) for (i, n) in enumerate(names))
+    tree.close()
+    built = time.time()
+    tree = BTree(filename, f"{Experiment.MAX_NAME_LEN}s")
+    opened = time.time()
+    for name in probes:
+        assert tree.get(name) is not None
+    looked = time.time()
+    found = [k for (k, _) in tree.items(low, high)]
+    end = time.time()
+    tree.close()
+    return built - start, opened - built, looked - opened, end - looked, \
+        len(found)
+
+def sweep(sizes):
+    result = []
+    for num in sizes:
+        names = make_names(num)
+        probes = random.Random(num).choices(names, k=LOOKUPS)
+        first = int(num * (1 - RANGE_FRACTION) / 2)
+        low = names[first]
+        high = names[min(first + max(int(num * RANGE_FRACTION), 1), num - 1)]
+        with tempfile.TemporaryDirectory() as db_dir:
+            write_records(db_dir, names)
+            *dict_times, dict_count = time_dict(db_dir, probes, low, high)
+            *tree_times, tree_count = \
+                time_tree(db_dir, names, probes, low, high)
+        assert dict_count == tree_count
+        result.append([num, *dict_times, *tree_times])
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    writer.writerow([
+        "records",
+        "dict_rebuild", "dict_lookup", "dict_range",
+        "tree_build", "tree_open", "tree_lookup", "tree_range",
+    ])
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [10000, 100000, 1000000]
+    report(sweep(sizes))
@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+class BufferPool:
+    def __init__(self, capacity, load, save):
+        assert capacity > 0, "buffer pool must hold at least one block"
+        self.capacity = capacity
+        self._load = load
+        self._save = save
+        self._blocks = OrderedDict()
+        self._dirty = set()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "writes": 0}
+        # Readers sharing a database call get at the same time, and each
+        # call reorders the pool, so every public method takes this lock.
+        self._lock = threading.RLock()
+
+    def get(self, block_id):
+        with self._lock:
+            if block_id in self._blocks:
+                self.stats["hits"] += 1
+                self._blocks.move_to_end(block_id)
+                return self._blocks[block_id]
+            self.stats["misses"] += 1
+            while len(self._blocks) >= self.capacity:
+                self._evict()
+            block = self._load(block_id)
+            self._blocks[block_id] = block
+            return block
+
+    def mark_dirty(self, block_id):
+        with self._lock:
+            assert block_id in self._blocks, f"block {block_id} is not pooled"
+            self._dirty.add(block_id)
+
+    def is_dirty(self, block_id):
+        with self._lock:
+            return block_id in self._dirty
+
+    def resident(self):
+        with self._lock:
+            return list(self._blocks.keys())
+
+    def hit_rate(self):
+        with self._lock:
+            total = self.stats["hits"] + self.stats["misses"]
+            return self.stats["hits"] / total if total else 0.0
+
+    def flush(self):
+        with self._lock:
+            for block_id in sorted(self._dirty):
+                self._write(block_id)
+
+    def clear(self):
+        with self._lock:
+            assert not self._dirty, "flush the pool before clearing it"
+            self._blocks.clear()
+
+    def _evict(self):
+        block_id, _ = next(iter(self._blocks.items()))
+        if block_id in self._dirty:
+            self._write(block_id)
+        del self._blocks[block_id]
+        self.stats["evictions"] += 1
+
+    def _write(self, block_id):
+        self._save(block_id, self._blocks[block_id])
+        self._dirty.discard(block_id)
+        self.stats["writes"] += 1
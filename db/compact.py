@@ -0,0 +1,24 @@
+import sys
+
+from blocked_file import BlockedFile
+from record import Experiment
+
+def count_records(db_dir):
+    return sum(
+        f.stat().st_size // Experiment.size() for f in db_dir.glob("*.db")
+    )
+
+def main():
+    assert len(sys.argv) in (2, 3), \
+        "Usage: compact.py db_dir [records_per_block]"
+    records_per_block = int(sys.argv[2]) if len(sys.argv) == 3 else None
+    db = BlockedFile(Experiment, sys.argv[1])
+    before = (db.num_blocks(), count_records(db._db_dir))
+    db.compact(records_per_block=records_per_block)
+    after = (db.num_blocks(), count_records(db._db_dir))
+    print(f"blocks: {before[0]} -> {after[0]}")
+    print(f"records stored: {before[1]} -> {after[1]}")
+    print(f"records per block: {db.block_size()}")
+
+if __name__ == "__main__":
+    main()
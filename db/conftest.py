@@ -0,0 +1,9 @@
+import pytest
+
+from record import Experiment
+
+@pytest.fixture
+def make_records():
+    def _make(num):
+        return [Experiment(f"ex{i}", 1000 + i, [i % 10]) for i in range(num)]
+    return _make
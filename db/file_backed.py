@@ -23,12 +23,12 @@ class FileBacked(Database):
     # mccole:helper
     def _save(self):
         packed = self._record_cls.pack_multi(self._data.values())
-        with open(self._filename, "w") as writer:
+        with open(self._filename, self._file_mode("w")) as writer:
             writer.write(packed)
 
     def _load(self):
         assert self._filename.exists()
-        with open(self._filename, "r") as reader:
+        with open(self._filename, self._file_mode("r")) as reader:
             raw = reader.read()
         records = self._record_cls.unpack_multi(raw)
         self._data = {self._record_cls.key(r): r for r in records}
@@ -0,0 +1,36 @@
+from file_backed import FileBacked
+from wal import WriteAheadLog, replace_atomically
+
+class FileBackedWAL(FileBacked):
+    LOG_SUFFIX = ".wal"
+
+    def __init__(self, record_cls, filename, **options):
+        super().__init__(record_cls, filename)
+        self._wal = WriteAheadLog(
+            f"{self._filename}{self.LOG_SUFFIX}", record_cls,
+            self._snapshot, self._checkpoint, **options
+        )
+        self._wal.recover(self._replay)
+
+    def add(self, record):
+        with self._wal.lock:
+            self._apply(record)
+            self._wal.append(record)
+
+    def sync(self):
+        self._wal.sync()
+
+    def close(self):
+        self._wal.close()
+
+    def _apply(self, record):
+        self._data[self._record_cls.key(record)] = record
+
+    def _replay(self, seq_id, record):
+        self._apply(record)  # keyed by record, so replaying is idempotent
+
+    def _snapshot(self):
+        return self._record_cls.pack_multi(self._data.values())
+
+    def _checkpoint(self, packed):
+        replace_atomically(self._filename, packed, self._file_mode("w"))
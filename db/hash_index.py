@@ -0,0 +1,94 @@
+import struct
+import zlib
+
+from mapped_file import MappedFile
+
+class HashIndex:
+    MAGIC = b"SDXHASH\0"
+    HEADER = struct.Struct("<8sII")  # magic, capacity, count
+    INITIAL_CAPACITY = 64
+    MAX_LOAD = 0.6
+
+    def __init__(self, filename, key_size):
+        self._key_size = key_size
+        # used, key, page, slot
+        self._bucket = struct.Struct(f"<B{key_size}sII")
+        initial = self._file_size(self.INITIAL_CAPACITY)
+        self._file = MappedFile(filename, initial)
+        if self._file.created:
+            self._capacity, self._count = self.INITIAL_CAPACITY, 0
+            self._save_header()
+        else:
+            magic, self._capacity, self._count = \
+                self._file.unpack_from(self.HEADER, 0)
+            assert magic == self.MAGIC, f"{filename} is not a hash index"
+
+    def __len__(self):
+        return self._count
+
+    def get(self, key):
+        position, found = self._find(self._encode(key))
+        if not found:
+            return None
+        _, _, page, slot = self._file.unpack_from(self._bucket, position)
+        return page, slot
+
+    def put(self, key, page, slot):
+        if self._count + 1 > self._capacity * self.MAX_LOAD:
+            self._resize(2 * self._capacity)
+        encoded = self._encode(key)
+        position, found = self._find(encoded)
+        self._file.pack_into(self._bucket, position, 1, encoded, page, slot)
+        if not found:
+            self._count += 1
+            self._save_header()
+
+    def items(self):
+        for i in range(self._capacity):
+            position = self._position(i)
+            used, key, page, slot = \
+                self._file.unpack_from(self._bucket, position)
+            if used:
+                yield key.rstrip(b"\0").decode("utf-8"), (page, slot)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _find(self, encoded):
+        i = zlib.crc32(encoded) % self._capacity
+        while True:
+            position = self._position(i)
+            used, key, _, _ = self._file.unpack_from(self._bucket, position)
+            if not used:
+                return position, False
+            if key == encoded:
+                return position, True
+            i = (i + 1) % self._capacity
+
+    def _resize(self, capacity):
+        entries = list(self.items())
+        self._file.grow(self._file_size(capacity))
+        self._file.write(self.HEADER.size, bytes(capacity * self._bucket.size))
+        self._capacity, self._count = capacity, 0
+        for (key, (page, slot)) in entries:
+            self.put(key, page, slot)
+        self._save_header()
+
+    def _encode(self, key):
+        encoded = key.encode("utf-8")
+        assert len(encoded) <= self._key_size, f"key {key} too long"
+        return encoded.ljust(self._key_size, b"\0")
+
+    def _position(self, i):
+        return self.HEADER.size + i * self._bucket.size
+
+    def _file_size(self, capacity):
+        return self.HEADER.size + capacity * self._bucket.size
+
+    def _save_header(self):
+        self._file.pack_into(
+            self.HEADER, 0, self.MAGIC, self._capacity, self._count
+        )
@@ -10,3 +10,8 @@ class Database:
     def get(self, key):
         """Return record associated with key or None."""
         raise NotImplementedError("get")
+
+    def _file_mode(self, mode):
+        """Add "b" to a file mode if records pack to bytes."""
+        binary = getattr(self._record_cls, "BINARY", False)
+        return f"{mode}b" if binary else mode
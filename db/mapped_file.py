@@ -0,0 +1,54 @@
+import mmap
+import os
+from pathlib import Path
+
+class MappedFile:
+    def __init__(self, filename, initial_size):
+        self.filename = Path(filename)
+        self.created = not self.filename.exists()
+        if self.created:
+            with open(self.filename, "wb") as writer:
+                writer.truncate(initial_size)
+        # The mapping needs the file to stay open until close() is called,
+        # so keep a plain descriptor rather than a file object.
+        self._fd = os.open(self.filename, os.O_RDWR)
+        self.mem = mmap.mmap(self._fd, 0)
+        self._dirty = set()
+
+    def size(self):
+        return len(self.mem)
+
+    def grow(self, new_size):
+        assert new_size >= self.size()
+        self.flush()
+        self.mem.close()
+        os.ftruncate(self._fd, new_size)
+        self.mem = mmap.mmap(self._fd, 0)
+
+    def unpack_from(self, fmt, offset):
+        return fmt.unpack_from(self.mem, offset)
+
+    def pack_into(self, fmt, offset, *values):
+        fmt.pack_into(self.mem, offset, *values)
+        self._mark_dirty(offset, fmt.size)
+
+    def write(self, offset, data):
+        self.mem[offset:offset + len(data)] = data
+        self._mark_dirty(offset, len(data))
+
+    def flush(self):
+        size = self.size()
+        for page in sorted(self._dirty):
+            start = page * mmap.PAGESIZE
+            self.mem.flush(start, min(mmap.PAGESIZE, size - start))
+        self._dirty.clear()
+
+    def close(self):
+        self.flush()
+        self.mem.close()
+        os.close(self._fd)
+
+    def _mark_dirty(self, offset, length):
+        first = offset // mmap.PAGESIZE
+        last = (offset + max(length, 1) - 1) // mmap.PAGESIZE
+        self._dirty.update(range(first, last + 1))
@@ -0,0 +1,117 @@
+import struct
+from pathlib import Path
+
+from hash_index import HashIndex
+from interface import Database
+from mapped_file import MappedFile
+
+class PagedFile(Database):
+    PAGE_SIZE = 4096
+    INITIAL_PAGES = 16
+    DATA_FILE = "data.pages"
+    INDEX_FILE = "index.hash"
+    MAGIC = b"SDXPAGE\0"
+    META = struct.Struct("<8sII")      # magic, pages in use, record size
+    PAGE_HEADER = struct.Struct("<H")  # slots in use
+
+    def __init__(self, record_cls, db_dir):
+        super().__init__(record_cls)
+        db_dir = Path(db_dir)
+        self._record_size = record_cls.size()
+        self._slot = struct.Struct(f"<{self._record_size}s")
+        self._slots_per_page = \
+            (self.PAGE_SIZE - self.PAGE_HEADER.size) // self._slot.size
+        self._data = MappedFile(
+            db_dir.joinpath(self.DATA_FILE),
+            self.INITIAL_PAGES * self.PAGE_SIZE
+        )
+        self._index = self._make_index(db_dir.joinpath(self.INDEX_FILE))
+        if self._data.created:
+            self._pages_used = 1  # page 0 holds metadata
+            self._save_meta()
+        else:
+            magic, self._pages_used, record_size = \
+                self._data.unpack_from(self.META, 0)
+            assert magic == self.MAGIC, "not a paged database"
+            assert record_size == self._record_size, "wrong record size"
+
+    def add(self, record):
+        key = self._record_cls.key(record)
+        location = self._index.get(key)
+        if location is None:
+            location = self._next_slot()
+            self._index.put(key, *location)
+        page, slot = location
+        self._data.pack_into(
+            self._slot, self._slot_offset(page, slot), self._encode(record)
+        )
+
+    def get(self, key):
+        location = self._index.get(key)
+        if location is None:
+            return None
+        return self._read_slot(*location)
+
+    def num_records(self):
+        return len(self._index)
+
+    def num_pages(self):
+        return self._pages_used - 1
+
+    def flush(self):
+        self._data.flush()
+        self._index.flush()
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    def _make_index(self, filename):
+        return HashIndex(filename, self._record_cls.MAX_NAME_LEN)
+
+    def _read_slot(self, page, slot):
+        offset = self._slot_offset(page, slot)
+        (raw,) = self._data.unpack_from(self._slot, offset)
+        return self._record_cls.unpack(raw.decode("utf-8"))
+
+    def _next_slot(self):
+        page = self._pages_used - 1
+        used = self._slots_in_use(page) if page > 0 else self._slots_per_page
+        if used == self._slots_per_page:
+            page, used = self._new_page(), 0
+        self._data.pack_into(
+            self.PAGE_HEADER, self._page_offset(page), used + 1
+        )
+        return page, used
+
+    def _new_page(self):
+        page = self._pages_used
+        self._pages_used += 1
+        needed = self._pages_used * self.PAGE_SIZE
+        if needed > self._data.size():
+            self._data.grow(max(needed, 2 * self._data.size()))
+        self._save_meta()
+        return page
+
+    def _slots_in_use(self, page):
+        (used,) = self._data.unpack_from(
+            self.PAGE_HEADER, self._page_offset(page)
+        )
+        return used
+
+    def _encode(self, record):
+        encoded = self._record_cls.pack(record).encode("utf-8")
+        assert len(encoded) == self._record_size, "record does not fit slot"
+        return encoded
+
+    def _page_offset(self, page):
+        return page * self.PAGE_SIZE
+
+    def _slot_offset(self, page, slot):
+        return self._page_offset(page) + self.PAGE_HEADER.size \
+            + slot * self._slot.size
+
+    def _save_meta(self):
+        self._data.pack_into(
+            self.META, 0, self.MAGIC, self._pages_used, self._record_size
+        )
@@ -0,0 +1,12 @@
+from btree import BTree
+from paged_file import PagedFile
+
+class PagedTree(PagedFile):
+    INDEX_FILE = "index.tree"
+
+    def scan(self, low=None, high=None):
+        for (_, (page, slot)) in self._index.items(low, high):
+            yield self._read_slot(page, slot)
+
+    def _make_index(self, filename):
+        return BTree(filename, f"{self._record_cls.MAX_NAME_LEN}s", "II")
@@ -0,0 +1,88 @@
+import numpy as np
+
+from record import Experiment
+
+class ExperimentColumnar(Experiment):
+    BINARY = True  # packs to bytes rather than text
+    COLUMNS = (
+        ("name", np.dtype(f"S{Experiment.MAX_NAME_LEN}")),
+        ("timestamp", np.dtype("<i8")),
+        ("count", np.dtype("u1")),
+        ("readings", np.dtype(("u1", (Experiment.MAX_READINGS_NUM,)))),
+    )
+    RECORD_LEN = sum(dtype.itemsize for (_, dtype) in COLUMNS)
+
+    @staticmethod
+    def size():
+        return ExperimentColumnar.RECORD_LEN
+
+    @staticmethod
+    def pack(record):
+        return ExperimentColumnar.pack_multi([record])
+
+    @staticmethod
+    def unpack(raw):
+        (record,) = ExperimentColumnar.unpack_multi(raw)
+        return record
+
+    @staticmethod
+    def pack_multi(records):
+        cls = ExperimentColumnar
+        return cls.pack_columns(cls.to_columns(records))
+
+    @staticmethod
+    def unpack_multi(raw):
+        cls = ExperimentColumnar
+        return cls.from_columns(cls.unpack_columns(raw))
+
+    @staticmethod
+    def pack_columns(columns):
+        # No header: the number of records is the length divided by
+        # RECORD_LEN, so one packed record is exactly size() bytes.
+        num = len(columns["name"])
+        parts = []
+        for (name, dtype) in ExperimentColumnar.COLUMNS:
+            column = np.ascontiguousarray(columns[name], dtype=dtype.base)
+            assert len(column) == num, f"column {name} has wrong length"
+            parts.append(column.tobytes())
+        return b"".join(parts)
+
+    @staticmethod
+    def unpack_columns(raw):
+        num, extra = divmod(len(raw), ExperimentColumnar.RECORD_LEN)
+        assert extra == 0, "packed columns are not a whole number of records"
+        offset = 0
+        columns = {}
+        for (name, dtype) in ExperimentColumnar.COLUMNS:
+            columns[name] = np.frombuffer(
+                raw, dtype=dtype, count=num, offset=offset
+            )
+            offset += num * dtype.itemsize
+        return columns
+
+    @staticmethod
+    def to_columns(records):
+        records = list(records)
+        width = Experiment.MAX_READINGS_NUM
+        names = [r._name.encode("utf-8") for r in records]
+        assert all(len(n) <= Experiment.MAX_NAME_LEN for n in names)
+        readings = [r._readings + [0] * (width - len(r._readings))
+                    for r in records]
+        return {
+            "name": np.array(names, dtype=f"S{Experiment.MAX_NAME_LEN}"),
+            "timestamp": np.array([r._timestamp for r in records], "<i8"),
+            "count": np.array([len(r._readings) for r in records], "u1"),
+            "readings": np.array(readings, "u1").reshape(len(records), width),
+        }
+
+    @staticmethod
+    def from_columns(columns):
+        names = [n.decode("utf-8") for n in columns["name"].tolist()]
+        readings = [
+            row[:count] for (row, count) in
+            zip(columns["readings"].tolist(), columns["count"].tolist())
+        ]
+        return [
+            Experiment(n, t, r) for (n, t, r) in
+            zip(names, columns["timestamp"].tolist(), readings)
+        ]
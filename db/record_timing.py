@@ -0,0 +1,61 @@
+import csv
+import sys
+import time
+
+from record import Experiment
+from record_columnar import ExperimentColumnar
+
+def make_records(num):
+    return [
+        Experiment(f"{i:06x}", 10000000 + i, [i % 10, (i // 10) % 10][:i % 3])
+        for i in range(num)
+    ]
+
+def time_text(records):
+    start = time.time()
+    packed = Experiment.pack_multi(records)
+    middle = time.time()
+    Experiment.unpack_multi(packed)
+    return middle - start, time.time() - middle
+
+def time_records(records):
+    start = time.time()
+    packed = ExperimentColumnar.pack_multi(records)
+    middle = time.time()
+    ExperimentColumnar.unpack_multi(packed)
+    return middle - start, time.time() - middle
+
+def time_columns(records):
+    columns = ExperimentColumnar.to_columns(records)
+    start = time.time()
+    packed = ExperimentColumnar.pack_columns(columns)
+    middle = time.time()
+    ExperimentColumnar.unpack_columns(packed)
+    return middle - start, time.time() - middle
+
+def sweep(sizes):
+    result = []
+    for num in sizes:
+        records = make_records(num)
+        result.append([
+            num,
+            *time_text(records),
+            *time_records(records),
+            *time_columns(records),
+        ])
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    writer.writerow([
+        "records",
+        "pack_text", "unpack_text",
+        "pack_records", "unpack_records",
+        "pack_columns", "unpack_columns",
+    ])
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or [1000, 10000, 100000, 1000000]
+    report(sweep(sizes))
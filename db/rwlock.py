@@ -0,0 +1,70 @@
+import fcntl
+import threading
+from contextlib import contextmanager
+
+class ReaderWriterLock:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._readers_waiting = 0
+        self._writers_waiting = 0
+        self._phase = 0      # number of writes completed
+        self._admitting = 0  # readers that waited through the last write
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            # Queue behind waiting writers so readers can't starve them,
+            # but always let in readers that have already waited for a
+            # write so a busy writer can't starve readers either.
+            phase = self._phase
+            self._readers_waiting += 1
+            while self._writing or \
+                    (self._writers_waiting and (phase == self._phase)):
+                self._cond.wait()
+            self._readers_waiting -= 1
+            if phase != self._phase:
+                self._admitting -= 1
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers or self._admitting:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._phase += 1
+                self._admitting = self._readers_waiting
+                self._cond.notify_all()
+
+@contextmanager
+def locked_file(lock_path, exclusive):
+    # Everyone passes through a turnstile before taking the main lock.
+    # A writer holds it while waiting, which stops new readers from
+    # starving the writer by keeping the shared lock busy.
+    with open(f"{lock_path}.turnstile", "a") as turnstile, \
+         open(lock_path, "a+") as handle:
+        fcntl.flock(turnstile, fcntl.LOCK_EX)
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        finally:
+            fcntl.flock(turnstile, fcntl.LOCK_UN)
+        try:
+            yield handle
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
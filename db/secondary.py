@@ -0,0 +1,87 @@
+from bisect import bisect_left, bisect_right, insort
+
+from record import Experiment
+
+class Field:
+    def __init__(self, extract, multi=False):
+        self.extract = extract
+        self.multi = multi
+
+    def values(self, record):
+        value = self.extract(record)
+        return set(value) if self.multi else {value}
+
+
+class SortedIndex:
+    def __init__(self, entries=()):
+        # Sort everything at once when building an index from scratch
+        # rather than inserting entries one by one.
+        self._entries = sorted(entries)  # sorted (value, key) pairs
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, value, key):
+        insort(self._entries, (value, key))
+
+    def remove(self, value, key):
+        i = bisect_left(self._entries, (value, key))
+        assert self._entries[i] == (value, key), f"{key} not indexed"
+        del self._entries[i]
+
+    def equal(self, value):
+        return self.between(value, value, inclusive=True)
+
+    def between(self, low=None, high=None, inclusive=False):
+        start, end = 0, len(self._entries)
+        if low is not None:
+            start = bisect_left(self._entries, low, key=_value)
+        if high is not None:
+            search = bisect_right if inclusive else bisect_left
+            end = search(self._entries, high, key=_value)
+        return [key for (_, key) in self._entries[start:end]]
+
+
+def _value(entry):
+    return entry[0]
+
+
+EXPERIMENT_FIELDS = {
+    "name": Field(lambda r: r._name),
+    "timestamp": Field(lambda r: r._timestamp),
+    "reading": Field(lambda r: r._readings, multi=True),
+}
+
+def fields_for(record_cls):
+    assert issubclass(record_cls, Experiment), \
+        f"no fields defined for {record_cls.__name__}"
+    return EXPERIMENT_FIELDS
+
+
+class Eq:
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+
+    def matches(self, values):
+        return self.value in values
+
+    def lookup(self, index):
+        return index.equal(self.value)
+
+
+class Range:
+    def __init__(self, field, low=None, high=None):
+        self.field = field
+        self.low = low
+        self.high = high
+
+    def matches(self, values):
+        return any(
+            ((self.low is None) or (self.low <= v)) and
+            ((self.high is None) or (v < self.high))
+            for v in values
+        )
+
+    def lookup(self, index):
+        return index.between(self.low, self.high)
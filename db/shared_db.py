@@ -0,0 +1,75 @@
+import threading
+from contextlib import contextmanager, nullcontext
+
+from rwlock import ReaderWriterLock, locked_file
+
+class SharedDatabase:
+    def __init__(self, factory, lock_path=None):
+        self._factory = factory
+        self._lock_path = lock_path
+        self._lock = ReaderWriterLock()
+        self._reload_lock = threading.Lock()
+        self._db, self._version = None, None
+        with self._file_lock(False) as handle:
+            self._db = factory()
+            if handle is not None:
+                self._version = self._read_version(handle)
+
+    def add(self, record):
+        with self._lock.write(), self._file_lock(True) as handle:
+            self._refresh(handle)
+            self._db.add(record)
+            self._bump_version(handle)
+
+    def get(self, key):
+        with self.snapshot() as view:
+            return view.get(key)
+
+    @contextmanager
+    def snapshot(self):
+        # Holding the read locks keeps writers in this process and in
+        # others out, so every read in the block sees the same state.
+        with self._lock.read(), self._file_lock(False) as handle:
+            yield ReadView(self._refresh(handle))
+
+    def _file_lock(self, exclusive):
+        if self._lock_path is None:
+            return nullcontext()
+        return locked_file(self._lock_path, exclusive)
+
+    def _refresh(self, handle):
+        if handle is None:
+            return self._db
+        version = self._read_version(handle)
+        with self._reload_lock:
+            if version != self._version:
+                self._db = self._factory()
+                self._version = version
+            return self._db
+
+    def _read_version(self, handle):
+        handle.seek(0)
+        text = handle.read().strip()
+        return int(text) if text else 0
+
+    def _bump_version(self, handle):
+        if handle is None:
+            return
+        self._version += 1
+        handle.truncate(0)
+        handle.write(str(self._version))
+        handle.flush()
+
+
+class ReadView:
+    # Engines make their own read paths safe for concurrent readers
+    # (for example, the buffer pool has a lock of its own), so readers
+    # sharing the read lock call into the engine at the same time.
+    def __init__(self, db):
+        self._db = db
+
+    def get(self, key):
+        return self._db.get(key)
+
+    def scan(self):
+        return self._db.scan()
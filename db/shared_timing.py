@@ -0,0 +1,103 @@
+import csv
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from blocked_file import BlockedFile
+from record import Experiment
+from shared_db import SharedDatabase
+
+DURATION = 1.0
+NUM_RECORDS = 1000
+RECORDS_PER_BLOCK = 64
+
+def make_record(i, timestamp):
+    return Experiment(f"ex{i}", timestamp, [i % 10])
+
+def populate(db_dir):
+    db = BlockedFile(Experiment, db_dir, records_per_block=RECORDS_PER_BLOCK)
+    db.bulk_load(make_record(i, 0) for i in range(NUM_RECORDS))
+
+def open_shared(db_dir, lock_path=None):
+    return SharedDatabase(
+        lambda: BlockedFile(Experiment, db_dir), lock_path
+    )
+
+def read_loop(db, seed, duration):
+    rng = random.Random(seed)
+    count, end = 0, time.time() + duration
+    while time.time() < end:
+        assert db.get(f"ex{rng.randrange(NUM_RECORDS)}") is not None
+        count += 1
+    return count
+
+def write_loop(db, duration):
+    count, end = 0, time.time() + duration
+    while time.time() < end:
+        db.add(make_record(count % NUM_RECORDS, count))
+        count += 1
+    return count
+
+def read_process(db_dir, lock_path, seed):
+    return read_loop(open_shared(db_dir, lock_path), seed, DURATION)
+
+def write_process(db_dir, lock_path):
+    return write_loop(open_shared(db_dir, lock_path), DURATION)
+
+def time_threads(db_dir, num_readers):
+    db = open_shared(db_dir)
+    reads = [0] * num_readers
+    def reader(i):
+        reads[i] = read_loop(db, i, DURATION)
+    threads = [
+        threading.Thread(target=reader, args=(i,)) for i in range(num_readers)
+    ]
+    for t in threads:
+        t.start()
+    writes = write_loop(db, DURATION)
+    for t in threads:
+        t.join()
+    return sum(reads) / DURATION, writes / DURATION
+
+def time_processes(db_dir, num_readers):
+    lock_path = Path(f"{db_dir}.lock")
+    with ProcessPoolExecutor(num_readers + 1) as pool:
+        writer = pool.submit(write_process, db_dir, lock_path)
+        readers = [
+            pool.submit(read_process, db_dir, lock_path, i)
+            for i in range(num_readers)
+        ]
+        reads = sum(r.result() for r in readers)
+        writes = writer.result()
+    return reads / DURATION, writes / DURATION
+
+def sweep(counts):
+    result = []
+    for num_readers in counts:
+        row = [num_readers]
+        for timer in (time_threads, time_processes):
+            with tempfile.TemporaryDirectory() as root:
+                db_dir = Path(root, "db")
+                db_dir.mkdir()
+                populate(db_dir)
+                row.extend(timer(db_dir, num_readers))
+        result.append(row)
+    return result
+
+def report(result):
+    writer = csv.writer(sys.stdout)
+    writer.writerow([
+        "readers",
+        "thread_reads", "thread_writes",
+        "process_reads", "process_writes",
+    ])
+    for row in result:
+        writer.writerow(row)
+
+if __name__ == "__main__":
+    counts = [int(s) for s in sys.argv[1:]] or [1, 2, 4, 8]
+    report(sweep(counts))
@@ -0,0 +1,12 @@
+from record import Experiment
+from record_columnar import ExperimentColumnar
+
+records = [
+    Experiment("abcdef", 12345, [6, 7]),
+    Experiment("gh", 67890, [8]),
+]
+packed = ExperimentColumnar.pack_multi(records)
+print(len(packed), "bytes")
+print(packed)
+for (name, values) in ExperimentColumnar.unpack_columns(packed).items():
+    print(name, values.tolist())
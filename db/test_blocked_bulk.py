@@ -0,0 +1,102 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from blocked import Blocked
+from blocked_file import BlockedFile
+from blocked_file_pooled import BlockedFilePooled
+from blocked_file_wal import BlockedFileWAL
+from blocked_indexed import BlockedIndexed
+from record import Experiment
+from secondary import Eq
+
+TEST_DIR = "/test"
+
+BLOCKED = [
+    (Blocked, Experiment),
+    (BlockedFile, Experiment, TEST_DIR),
+    (BlockedFilePooled, Experiment, TEST_DIR),
+    (BlockedFileWAL, Experiment, TEST_DIR),
+]
+
+@pytest.fixture
+def filesys(fs):
+    Path(TEST_DIR).mkdir()
+    return fs
+
+@pytest.fixture(params=BLOCKED)
+def db(request, filesys):
+    cls = request.param[0]
+    args = request.param[1:]
+    db = cls(*args)
+    yield db
+    if hasattr(db, "close"):
+        db.close()
+
+def test_bulk_load_then_get(db, make_records):
+    records = make_records(7)
+    db.bulk_load(iter(records))
+    assert db.num_records() == len(records)
+    assert db.num_blocks() == 4
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+
+def test_scan_yields_live_records(db, make_records):
+    records = make_records(5)
+    db.bulk_load(records)
+    replacement = Experiment("ex1", 9999, [])
+    db.add(replacement)
+    expected = [records[0], *records[2:], replacement]
+    assert list(db.scan()) == expected
+
+def test_scan_empty(db):
+    assert list(db.scan()) == []
+
+def test_bulk_load_writes_each_block_once(filesys, make_records):
+    db = BlockedFile(Experiment, TEST_DIR)
+    with patch.object(
+        BlockedFile, "_save_block", autospec=True,
+        side_effect=BlockedFile._save_block
+    ) as spy:
+        db.bulk_load(make_records(9))
+    assert spy.call_count == 5
+    assert len(list(Path(TEST_DIR).glob("*.db"))) == 5
+
+def test_file_scan_streams_from_disk(filesys, make_records):
+    BlockedFile(Experiment, TEST_DIR).bulk_load(make_records(9))
+    db = BlockedFile(Experiment, TEST_DIR)
+    with patch.object(
+        Experiment, "unpack_multi", side_effect=Experiment.unpack_multi
+    ) as spy:
+        stream = db.scan()
+        next(stream)
+        next(stream)
+        assert spy.call_count == 1
+        assert len(list(stream)) == 7
+        assert spy.call_count == 5
+
+def test_indexed_bulk_load_updates_indexes(filesys, make_records):
+    db = BlockedIndexed(Experiment, TEST_DIR, indexes=["timestamp"])
+    db.bulk_load(make_records(5) + [Experiment("ex2", 1, [])])
+    assert list(db.query(Eq("timestamp", 1002))) == []
+    assert list(db.query(Eq("timestamp", 1))) == [Experiment("ex2", 1, [])]
+
+def test_file_bulk_load_keeps_memory_bounded(filesys, make_records):
+    records = make_records(9)
+    db = BlockedFile(Experiment, TEST_DIR)
+    db.bulk_load(records)
+    assert sum(len(b) for b in db._blocks) <= db.block_size()
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert sum(len(b) for b in db._blocks) <= db.block_size()
+    assert db.num_blocks() == 5
+    extra = Experiment("extra", 1, [])
+    db.add(extra)
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert all(db.get(Experiment.key(r)) == r for r in records + [extra])
+
+def test_pooled_bulk_load_survives_reopen(filesys, make_records):
+    records = make_records(9)
+    BlockedFilePooled(Experiment, TEST_DIR, pool_size=1).bulk_load(records)
+    db = BlockedFilePooled(Experiment, TEST_DIR, pool_size=1)
+    assert db.num_records() == len(records)
+    assert all(db.get(Experiment.key(r)) == r for r in records)
@@ -0,0 +1,82 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from blocked_indexed import BlockedIndexed
+from record import Experiment
+from secondary import Eq, Range, SortedIndex
+
+TEST_DIR = "/test"
+
+@pytest.fixture
+def filesys(fs):
+    Path(TEST_DIR).mkdir()
+    return fs
+
+@pytest.fixture
+def db(filesys):
+    db = BlockedIndexed(Experiment, TEST_DIR, indexes=["timestamp", "reading"])
+    for (i, readings) in enumerate([[1, 2], [2], [], [3, 3], [1]]):
+        db.add(Experiment(f"ex{i}", 100 + 10 * i, readings))
+    return db
+
+def names(records):
+    return sorted(Experiment.key(r) for r in records)
+
+def test_sorted_index_equal_and_between():
+    index = SortedIndex()
+    for (value, key) in [(3, "c"), (1, "a"), (2, "b"), (2, "bb")]:
+        index.add(value, key)
+    assert index.equal(2) == ["b", "bb"]
+    assert index.between(2, 3) == ["b", "bb"]
+    assert index.between(low=2) == ["b", "bb", "c"]
+    assert index.between(high=2) == ["a"]
+    index.remove(2, "b")
+    assert index.equal(2) == ["bb"]
+
+def test_query_equality_uses_index(db):
+    assert db.explain(Eq("timestamp", 120)) == "index timestamp"
+    assert names(db.query(Eq("timestamp", 120))) == ["ex2"]
+    assert list(db.query(Eq("timestamp", 121))) == []
+
+def test_query_range_uses_index(db):
+    assert names(db.query(Range("timestamp", 110, 130))) == ["ex1", "ex2"]
+    assert names(db.query(Range("timestamp", low=130))) == ["ex3", "ex4"]
+
+def test_query_multi_valued_field(db):
+    assert names(db.query(Eq("reading", 1))) == ["ex0", "ex4"]
+    assert names(db.query(Eq("reading", 3))) == ["ex3"]
+
+def test_query_combines_predicates(db):
+    result = db.query(Eq("reading", 1), Range("timestamp", high=120))
+    assert names(result) == ["ex0"]
+
+def test_query_without_index_scans(db):
+    assert db.explain(Eq("name", "ex3")) == "scan"
+    assert names(db.query(Eq("name", "ex3"))) == ["ex3"]
+    assert names(db.query()) == [f"ex{i}" for i in range(5)]
+
+def test_indexes_follow_overwrites(db):
+    db.add(Experiment("ex1", 999, [7]))
+    assert list(db.query(Eq("timestamp", 110))) == []
+    assert names(db.query(Eq("timestamp", 999))) == ["ex1"]
+    assert names(db.query(Eq("reading", 2))) == ["ex0"]
+    assert names(db.query(Eq("name", "ex1"))) == ["ex1"]
+
+def test_indexes_rebuilt_on_restart(db):
+    second = BlockedIndexed(Experiment, TEST_DIR, indexes=["timestamp"])
+    assert names(second.query(Range("timestamp", 100, 120))) == ["ex0", "ex1"]
+
+def test_restart_reads_blocks_once_and_skips_stale_copies(db):
+    db.add(Experiment("ex1", 999, [7]))
+    with patch.object(BlockedIndexed, "scan") as scan:
+        second = BlockedIndexed(Experiment, TEST_DIR, indexes=["timestamp"])
+    assert not scan.called
+    assert list(second.query(Eq("timestamp", 110))) == []
+    assert names(second.query(Eq("timestamp", 999))) == ["ex1"]
+    assert len(second._secondary["timestamp"]) == 5
+
+def test_sorted_index_built_from_entries():
+    index = SortedIndex([(3, "c"), (1, "a"), (2, "b")])
+    assert index.between(low=2) == ["b", "c"]
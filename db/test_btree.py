@@ -0,0 +1,105 @@
+import random
+import pytest
+
+from btree import BTree
+
+class SmallTree(BTree):
+    PAGE_SIZE = 128  # force splits with only a few keys
+
+@pytest.fixture
+def tree(tmp_path):
+    tree = SmallTree(tmp_path.joinpath("index.tree"), "6s")
+    yield tree
+    tree.close()
+
+def make_keys(num):
+    return [f"k{i:05}" for i in range(num)]
+
+def test_btree_empty(tree):
+    assert len(tree) == 0
+    assert tree.get("abc") is None
+    assert list(tree.items()) == []
+
+def test_btree_put_then_get(tree):
+    tree.put("abc", 17)
+    assert tree.get("abc") == 17
+    assert tree.get("abd") is None
+
+def test_btree_overwrite(tree):
+    tree.put("abc", 17)
+    tree.put("abc", 23)
+    assert tree.get("abc") == 23
+    assert len(tree) == 1
+
+def test_btree_many_keys_in_random_order(tree):
+    keys = make_keys(1000)
+    shuffled = keys[:]
+    random.Random(1234).shuffle(shuffled)
+    for (i, key) in enumerate(shuffled):
+        tree.put(key, i)
+    assert len(tree) == len(keys)
+    assert [k for (k, _) in tree.items()] == keys
+    assert all(tree.get(key) == i for (i, key) in enumerate(shuffled))
+
+def test_btree_range_scan(tree):
+    keys = make_keys(300)
+    for (i, key) in enumerate(keys):
+        tree.put(key, i)
+    assert list(tree.items("k00100", "k00105")) == \
+        [(k, i) for (i, k) in enumerate(keys) if "k00100" <= k < "k00105"]
+    assert [k for (k, _) in tree.items(low="k00297")] == keys[297:]
+    assert [k for (k, _) in tree.items(high="k00003")] == keys[:3]
+    assert list(tree.items("x", "y")) == []
+
+def test_btree_remove(tree):
+    keys = make_keys(100)
+    for (i, key) in enumerate(keys):
+        tree.put(key, i)
+    for key in keys[10:90]:
+        assert tree.remove(key)
+    assert not tree.remove("k00050")
+    assert len(tree) == 20
+    assert [k for (k, _) in tree.items()] == keys[:10] + keys[90:]
+
+def test_btree_bulk_load_matches_inserts(tmp_path):
+    items = [(key, i) for (i, key) in enumerate(make_keys(1000))]
+    tree = SmallTree(tmp_path.joinpath("index.tree"), "6s")
+    tree.bulk_load(iter(items))
+    assert list(tree.items()) == items
+    assert tree.get("k00500") == 500
+    tree.put("j", 1)
+    assert next(tree.items()) == ("j", 1)
+    assert len(tree) == len(items) + 1
+    tree.close()
+
+def test_btree_bulk_load_requires_sorted_keys(tree):
+    with pytest.raises(AssertionError):
+        tree.bulk_load([("b", 1), ("a", 2)])
+
+def test_btree_rejects_long_keys(tree):
+    tree.put("abcdef", 1)
+    with pytest.raises(AssertionError):
+        tree.put("abcdefg", 2)
+    assert tree.get("abcdefg") is None
+    assert len(tree) == 1
+
+def test_btree_restart(tmp_path):
+    filename = tmp_path.joinpath("index.tree")
+    first = SmallTree(filename, "6s")
+    for (i, key) in enumerate(make_keys(500)):
+        first.put(key, i)
+    first.close()
+    second = SmallTree(filename, "6s")
+    assert len(second) == 500
+    assert second.get("k00321") == 321
+    second.close()
+
+def test_btree_composite_keys_and_values(tmp_path):
+    tree = SmallTree(tmp_path.joinpath("index.tree"), "q6s", "II")
+    tree.put((20, "b"), 1, 2)
+    tree.put((10, "z"), 3, 4)
+    tree.put((20, "a"), 5, 6)
+    assert tree.get((20, "a")) == (5, 6)
+    assert list(tree.items((15, ""), (30, ""))) == \
+        [((20, "a"), (5, 6)), ((20, "b"), (1, 2))]
+    tree.close()
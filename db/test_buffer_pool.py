@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from blocked import Blocked
+from blocked_file_pooled import BlockedFilePooled
+from buffer_pool import BufferPool
+from record import Experiment
+
+TEST_DIR = "/test"
+
+class Backing:
+    def __init__(self):
+        self.loads = []
+        self.saves = []
+
+    def load(self, block_id):
+        self.loads.append(block_id)
+        return {"id": block_id}
+
+    def save(self, block_id, block):
+        self.saves.append((block_id, dict(block)))
+
+@pytest.fixture
+def backing():
+    return Backing()
+
+@pytest.fixture
+def filesys(fs):
+    Path(TEST_DIR).mkdir()
+    return fs
+
+def test_pool_loads_once_then_hits(backing):
+    pool = BufferPool(2, backing.load, backing.save)
+    assert pool.get(0) == {"id": 0}
+    assert pool.get(0) == {"id": 0}
+    assert backing.loads == [0]
+    assert pool.stats["hits"] == 1
+    assert pool.stats["misses"] == 1
+    assert pool.hit_rate() == 0.5
+
+def test_pool_evicts_least_recently_used(backing):
+    pool = BufferPool(2, backing.load, backing.save)
+    pool.get(0)
+    pool.get(1)
+    pool.get(0)
+    pool.get(2)
+    assert pool.resident() == [0, 2]
+    assert pool.stats["evictions"] == 1
+    assert backing.saves == []
+
+def test_pool_writes_dirty_blocks_on_eviction(backing):
+    pool = BufferPool(1, backing.load, backing.save)
+    pool.get(0)["value"] = 123
+    pool.mark_dirty(0)
+    pool.get(1)
+    assert backing.saves == [(0, {"id": 0, "value": 123})]
+    assert not pool.is_dirty(0)
+
+def test_pool_flush_writes_only_dirty_blocks(backing):
+    pool = BufferPool(4, backing.load, backing.save)
+    for i in range(3):
+        pool.get(i)
+    pool.mark_dirty(2)
+    pool.flush()
+    pool.flush()
+    assert [block_id for (block_id, _) in backing.saves] == [2]
+    assert pool.stats["writes"] == 1
+
+def test_pooled_add_then_get(filesys):
+    db = BlockedFilePooled(Experiment, TEST_DIR)
+    ex = Experiment("ex01", 12345, [1, 2])
+    db.add(ex)
+    assert db.get("ex01") == ex
+    assert db.get("nope") is None
+
+def test_pooled_memory_is_bounded(filesys, make_records):
+    db = BlockedFilePooled(Experiment, TEST_DIR, pool_size=3)
+    records = make_records(20)
+    for r in records:
+        db.add(r)
+    assert len(db._pool.resident()) == 3
+    assert db.num_blocks() == len(records) // Blocked.size()
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+
+def test_pooled_repeated_reads_hit_memory(filesys):
+    db = BlockedFilePooled(Experiment, TEST_DIR, pool_size=2)
+    ex = Experiment("ex01", 12345, [1, 2])
+    db.add(ex)
+    before = db.get_stats()
+    for _ in range(10):
+        assert db.get("ex01") == ex
+    after = db.get_stats()
+    assert after["hits"] - before["hits"] == 10
+    assert after["misses"] == before["misses"]
+
+def test_pooled_restart(filesys, make_records):
+    records = make_records(9)
+    first = BlockedFilePooled(Experiment, TEST_DIR, pool_size=2)
+    for r in records:
+        first.add(r)
+    first.close()
+
+    second = BlockedFilePooled(Experiment, TEST_DIR, pool_size=2)
+    assert second.num_records() == len(records)
+    assert second.get_stats()["misses"] == 0
+    assert all(second.get(Experiment.key(r)) == r for r in records)
+    second.add(Experiment("new", 1, [1]))
+    assert second.get("new") == Experiment("new", 1, [1])
+    assert second.get("ex8") == records[8]
+
+class SlowBacking(Backing):
+    def load(self, block_id):
+        time.sleep(0.001)  # widen the window for races between readers
+        return super().load(block_id)
+
+def test_pool_concurrent_gets():
+    backing = SlowBacking()
+    pool = BufferPool(2, backing.load, backing.save)
+    block_ids = [i % 5 for i in range(200)]
+    with ThreadPoolExecutor(8) as workers:
+        blocks = list(workers.map(pool.get, block_ids))
+    assert [b["id"] for b in blocks] == block_ids
+    assert len(pool.resident()) == 2
+    assert pool.stats["hits"] + pool.stats["misses"] == len(block_ids)
+    assert pool.stats["misses"] == len(backing.loads)
+    assert pool.stats["evictions"] == pool.stats["misses"] - 2
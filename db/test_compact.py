@@ -0,0 +1,137 @@
+from pathlib import Path
+
+import pytest
+
+from blocked import Blocked
+from blocked_file import BlockedFile
+from blocked_file_pooled import BlockedFilePooled
+from blocked_file_wal import BlockedFileWAL
+from blocked_indexed import BlockedIndexed
+from record import Experiment
+from secondary import Eq
+
+TEST_DIR = "/test"
+
+@pytest.fixture
+def filesys(fs):
+    Path(TEST_DIR).mkdir()
+    return fs
+
+def num_files():
+    return len(list(Path(TEST_DIR).glob("*.db")))
+
+def test_block_size_in_records(make_records):
+    db = Blocked(Experiment, records_per_block=5)
+    db.bulk_load(make_records(12))
+    assert db.block_size() == 5
+    assert db.num_blocks() == 3
+
+def test_block_size_in_bytes():
+    db = Blocked(Experiment, block_bytes=3 * Experiment.size() + 1)
+    assert db.block_size() == 3
+
+def test_block_size_needs_one_unit():
+    with pytest.raises(AssertionError):
+        Blocked(Experiment, records_per_block=2, block_bytes=100)
+    with pytest.raises(AssertionError):
+        Blocked(Experiment, block_bytes=1)
+
+def test_file_block_size_is_read_back(filesys, make_records):
+    records = make_records(12)
+    BlockedFile(Experiment, TEST_DIR, records_per_block=5).bulk_load(records)
+    assert num_files() == 3
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert db.block_size() == 5
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+    with pytest.raises(AssertionError):
+        BlockedFile(Experiment, TEST_DIR, records_per_block=4)
+
+def test_file_block_size_with_one_block(filesys, make_records):
+    records = make_records(50)
+    BlockedFile(Experiment, TEST_DIR, records_per_block=100).bulk_load(records)
+    assert num_files() == 1
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert db.block_size() == 100
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+
+def test_file_without_metadata_uses_default_size(filesys, make_records):
+    records = make_records(5)
+    BlockedFile(Experiment, TEST_DIR).bulk_load(records)
+    Path(TEST_DIR, BlockedFile.META_FILE).unlink()
+    with pytest.raises(AssertionError):
+        BlockedFile(Experiment, TEST_DIR, records_per_block=4)
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert db.block_size() == BlockedFile.RECORDS_PER_BLOCK
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+    assert Path(TEST_DIR, BlockedFile.META_FILE).exists()
+
+FILE_CLASSES = [BlockedFile, BlockedFilePooled, BlockedFileWAL]
+
+@pytest.mark.parametrize("cls", FILE_CLASSES)
+def test_compact_removes_dead_records(filesys, cls, make_records):
+    records = make_records(6)
+    db = cls(Experiment, TEST_DIR)
+    db.bulk_load(records)
+    replacements = [Experiment(f"ex{i}", 9, []) for i in range(3)]
+    for r in replacements:
+        db.add(r)
+    live = records[3:] + replacements
+    db.compact(records_per_block=4)
+    assert num_files() == 2
+    assert db.num_records() == len(live)
+    assert list(db.scan()) == live
+    assert all(db.get(Experiment.key(r)) == r for r in live)
+    db.add(Experiment("new", 1, [1]))
+    assert db.get("new") == Experiment("new", 1, [1])
+    if hasattr(db, "close"):
+        db.close()
+    reopened = BlockedFile(Experiment, TEST_DIR)
+    assert reopened.block_size() == 4
+    assert sorted(map(Experiment.key, reopened.scan())) == \
+        sorted(["new", *map(Experiment.key, live)])
+
+def test_compact_keeps_secondary_indexes(filesys, make_records):
+    db = BlockedIndexed(Experiment, TEST_DIR, indexes=["timestamp"])
+    db.bulk_load(make_records(5))
+    db.add(Experiment("ex0", 1, []))
+    db.compact()
+    assert list(db.query(Eq("timestamp", 1))) == [Experiment("ex0", 1, [])]
+    assert list(db.query(Eq("timestamp", 1000))) == []
+
+def test_compact_keeps_full_leading_blocks(filesys, make_records):
+    db = BlockedFile(Experiment, TEST_DIR, records_per_block=2)
+    db.bulk_load(make_records(8))
+    kept = [Path(TEST_DIR, f"000{i}.db").stat().st_ino for i in range(2)]
+    db.add(Experiment("ex5", 9, []))
+    db.compact()
+    assert [Path(TEST_DIR, f"000{i}.db").stat().st_ino for i in range(2)] \
+        == kept
+    assert num_files() == 4
+    assert [Experiment.key(r) for r in db.scan()] == \
+        ["ex0", "ex1", "ex2", "ex3", "ex4", "ex6", "ex7", "ex5"]
+
+def test_compact_removes_stale_work_dir(filesys, make_records):
+    db = BlockedFile(Experiment, TEST_DIR)
+    db.bulk_load(make_records(4))
+    Path(f"{TEST_DIR}.compact").mkdir()
+    Path(f"{TEST_DIR}.compact", "0000.db").write_text("junk")
+    db.compact(records_per_block=4)
+    assert not Path(f"{TEST_DIR}.compact").exists()
+    assert num_files() == 1
+
+def test_open_recovers_from_interrupted_swap(filesys, make_records):
+    records = make_records(4)
+    BlockedFile(Experiment, TEST_DIR).bulk_load(records)
+    # Crash after moving the database aside but before the swap.
+    Path(TEST_DIR).rename(f"{TEST_DIR}.old")
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+    assert not Path(f"{TEST_DIR}.old").exists()
+
+def test_open_removes_old_copy_after_swap(filesys, make_records):
+    records = make_records(4)
+    BlockedFile(Experiment, TEST_DIR).bulk_load(records)
+    Path(f"{TEST_DIR}.old").mkdir()
+    db = BlockedFile(Experiment, TEST_DIR)
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+    assert not Path(f"{TEST_DIR}.old").exists()
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+import pytest
+
+from hash_index import HashIndex
+from paged_file import PagedFile
+from record import Experiment
+
+@pytest.fixture
+def db(tmp_path):
+    db = PagedFile(Experiment, tmp_path)
+    yield db
+    db.close()
+
+def test_paged_empty(db):
+    assert db.get("nope") is None
+    assert db.num_records() == 0
+
+def test_paged_add_then_get(db):
+    ex = Experiment("ex01", 12345, [1, 2])
+    db.add(ex)
+    assert db.get("ex01") == ex
+
+def test_paged_overwrite_in_place(db):
+    db.add(Experiment("ex01", 12345, [1, 2]))
+    replacement = Experiment("ex01", 67890, [3])
+    db.add(replacement)
+    assert db.get("ex01") == replacement
+    assert db.num_records() == 1
+    assert db.num_pages() == 1
+
+def test_paged_fills_many_pages(db, make_records):
+    records = make_records(5000)
+    for r in records:
+        db.add(r)
+    assert db.num_records() == len(records)
+    assert db.num_pages() > PagedFile.INITIAL_PAGES
+    for r in records:
+        assert db.get(Experiment.key(r)) == r
+
+def test_paged_restart(tmp_path, make_records):
+    records = make_records(500)
+    first = PagedFile(Experiment, tmp_path)
+    for r in records:
+        first.add(r)
+    first.close()
+
+    second = PagedFile(Experiment, tmp_path)
+    assert second.num_records() == len(records)
+    for r in records:
+        assert second.get(Experiment.key(r)) == r
+    second.close()
+
+def test_paged_open_does_not_scan_data(tmp_path, make_records):
+    first = PagedFile(Experiment, tmp_path)
+    for r in make_records(500):
+        first.add(r)
+    first.close()
+    with patch.object(HashIndex, "items") as spy:
+        second = PagedFile(Experiment, tmp_path)
+        second.close()
+    assert spy.call_count == 0
+
+def test_paged_flush_clears_dirty_pages(db):
+    db.add(Experiment("ex01", 12345, [1, 2]))
+    assert db._data._dirty
+    db.flush()
+    assert not db._data._dirty
@@ -0,0 +1,42 @@
+import pytest
+
+from paged_tree import PagedTree
+from record import Experiment
+
+@pytest.fixture
+def db(tmp_path):
+    db = PagedTree(Experiment, tmp_path)
+    yield db
+    db.close()
+
+def test_paged_tree_add_then_get(db):
+    ex = Experiment("ex01", 12345, [1, 2])
+    db.add(ex)
+    assert db.get("ex01") == ex
+    assert db.get("ex02") is None
+
+def test_paged_tree_overwrite_in_place(db):
+    db.add(Experiment("ex01", 12345, [1, 2]))
+    replacement = Experiment("ex01", 67890, [3])
+    db.add(replacement)
+    assert db.get("ex01") == replacement
+    assert db.num_records() == 1
+
+def test_paged_tree_scans_in_key_order(db, make_records):
+    records = sorted(make_records(2000), key=Experiment.key)
+    for r in reversed(records):
+        db.add(r)
+    assert list(db.scan()) == records
+    low, high = Experiment.key(records[100]), Experiment.key(records[110])
+    assert list(db.scan(low, high)) == records[100:110]
+
+def test_paged_tree_restart(tmp_path, make_records):
+    records = make_records(500)
+    first = PagedTree(Experiment, tmp_path)
+    for r in records:
+        first.add(r)
+    first.close()
+    second = PagedTree(Experiment, tmp_path)
+    assert second.num_records() == len(records)
+    assert second.get("ex321") == records[321]
+    second.close()
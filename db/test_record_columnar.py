@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from blocked_file import BlockedFile
+from blocked_file_pooled import BlockedFilePooled
+from blocked_file_wal import BlockedFileWAL
+from file_backed import FileBacked
+from record import Experiment
+from record_columnar import ExperimentColumnar
+
+TEST_DIR = "/test"
+
+ENGINES = [
+    lambda: FileBacked(ExperimentColumnar, Path(TEST_DIR, "records.db")),
+    lambda: BlockedFile(ExperimentColumnar, TEST_DIR, records_per_block=2),
+    lambda: BlockedFilePooled(
+        ExperimentColumnar, TEST_DIR, pool_size=1, records_per_block=2
+    ),
+    # The log frames records by size(), so this checks that one packed
+    # record is exactly that long.
+    lambda: BlockedFileWAL(ExperimentColumnar, TEST_DIR, records_per_block=2),
+]
+
+@pytest.fixture
+def records():
+    return [
+        Experiment("abcdef", 12345, [6, 7]),
+        Experiment("gh", 67890, [8]),
+        Experiment("i", 0, []),
+    ]
+
+def test_columnar_round_trip(records):
+    packed = ExperimentColumnar.pack_multi(records)
+    assert isinstance(packed, bytes)
+    assert ExperimentColumnar.unpack_multi(packed) == records
+
+def test_columnar_size(records):
+    packed = ExperimentColumnar.pack_multi(records)
+    assert len(packed) == len(records) * ExperimentColumnar.size()
+    assert len(ExperimentColumnar.pack(records[0])) == ExperimentColumnar.size()
+
+def test_columnar_single_record(records):
+    packed = ExperimentColumnar.pack(records[0])
+    assert ExperimentColumnar.unpack(packed) == records[0]
+
+def test_columnar_empty():
+    packed = ExperimentColumnar.pack_multi([])
+    assert ExperimentColumnar.unpack_multi(packed) == []
+
+def test_columnar_rejects_partial_record(records):
+    packed = ExperimentColumnar.pack_multi(records)
+    with pytest.raises(AssertionError):
+        ExperimentColumnar.unpack_multi(packed[:-1])
+
+def test_columnar_columns_are_views(records):
+    packed = ExperimentColumnar.pack_multi(records)
+    columns = ExperimentColumnar.unpack_columns(packed)
+    assert columns["timestamp"].tolist() == [12345, 67890, 0]
+    assert columns["count"].tolist() == [2, 1, 0]
+    assert columns["name"].base is not None  # no copy of the buffer
+
+def test_columnar_pack_columns_matches_records(records):
+    columns = ExperimentColumnar.to_columns(records)
+    assert ExperimentColumnar.pack_columns(columns) == \
+        ExperimentColumnar.pack_multi(records)
+
+def test_columnar_rejects_mismatched_columns(records):
+    columns = ExperimentColumnar.to_columns(records)
+    columns["timestamp"] = columns["timestamp"][:1]
+    with pytest.raises(AssertionError):
+        ExperimentColumnar.pack_columns(columns)
+
+@pytest.mark.parametrize("make_db", ENGINES)
+def test_columnar_engine_round_trip(fs, records, make_db):
+    Path(TEST_DIR).mkdir()
+    db = make_db()
+    for r in records:
+        db.add(r)
+    if hasattr(db, "close"):
+        db.close()
+    db = make_db()
+    for r in records:
+        assert db.get(Experiment.key(r)) == r
+    assert db.get("nope") is None
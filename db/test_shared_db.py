@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from blocked_file import BlockedFile
+from blocked_file_pooled import BlockedFilePooled
+from file_backed import FileBacked
+from record import Experiment
+from rwlock import ReaderWriterLock
+from shared_db import SharedDatabase
+
+NUM_WRITES = 20
+
+def open_blocked(db_dir):
+    return SharedDatabase(
+        lambda: BlockedFile(Experiment, db_dir), f"{db_dir}.lock"
+    )
+
+def write_records(db_dir, records):
+    db = open_blocked(db_dir)
+    for r in records:
+        db.add(r)
+    return len(records)
+
+def test_rwlock_allows_many_readers():
+    lock = ReaderWriterLock()
+    with lock.read(), lock.read():
+        pass
+
+def test_rwlock_excludes_writer_while_reading():
+    lock = ReaderWriterLock()
+    order = []
+    def writer():
+        with lock.write():
+            order.append("write")
+    with lock.read():
+        thread = threading.Thread(target=writer)
+        thread.start()
+        time.sleep(0.05)
+        order.append("read")
+    thread.join()
+    assert order == ["read", "write"]
+
+def test_shared_in_process(tmp_path, make_records):
+    db = SharedDatabase(lambda: FileBacked(Experiment, tmp_path / "test.db"))
+    records = make_records(3)
+    for r in records:
+        db.add(r)
+    assert all(db.get(Experiment.key(r)) == r for r in records)
+
+def test_snapshot_blocks_writer(tmp_path):
+    db = SharedDatabase(lambda: FileBacked(Experiment, tmp_path / "test.db"))
+    db.add(Experiment("ex0", 1, []))
+    writer = threading.Thread(
+        target=db.add, args=(Experiment("ex0", 2, []),)
+    )
+    with db.snapshot() as view:
+        writer.start()
+        time.sleep(0.05)
+        assert view.get("ex0") == Experiment("ex0", 1, [])
+        assert writer.is_alive()
+    writer.join()
+    assert db.get("ex0") == Experiment("ex0", 2, [])
+
+class OverlapCounter:
+    def __init__(self):
+        self.active = 0
+        self.most = 0
+
+    def get(self, key):
+        self.active += 1
+        self.most = max(self.most, self.active)
+        time.sleep(0.01)
+        self.active -= 1
+        return key
+
+def test_readers_share_engine():
+    engine = OverlapCounter()
+    db = SharedDatabase(lambda: engine)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(db.get, range(8)))
+    assert results == list(range(8))
+    assert engine.most > 1
+
+def test_concurrent_reads_through_buffer_pool(tmp_path, make_records):
+    records = make_records(40)
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    BlockedFile(Experiment, db_dir).bulk_load(records)
+    engine = BlockedFilePooled(Experiment, db_dir, pool_size=2)
+    db = SharedDatabase(lambda: engine)
+    keys = [Experiment.key(records[i % 40]) for i in range(7, 1007, 7)]
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(db.get, keys))
+    assert [Experiment.key(r) for r in results] == keys
+    stats = engine.get_stats()
+    assert stats["hits"] + stats["misses"] == len(keys)
+    assert len(engine._pool.resident()) <= 2
+    assert engine.num_blocks() == 20
+
+def test_reader_sees_other_writer(tmp_path):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    writer = open_blocked(db_dir)
+    reader = open_blocked(db_dir)
+    assert reader.get("ex0") is None
+    writer.add(Experiment("ex0", 1, []))
+    assert reader.get("ex0") == Experiment("ex0", 1, [])
+
+def test_reader_sees_writer_process(tmp_path, make_records):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    reader = open_blocked(db_dir)
+    with ProcessPoolExecutor(1) as pool:
+        future = pool.submit(write_records, db_dir, make_records(NUM_WRITES))
+        while not future.done():
+            with reader.snapshot() as view:
+                seen = list(view.scan())
+            assert seen == make_records(len(seen))
+        assert future.result() == NUM_WRITES
+    with reader.snapshot() as view:
+        assert list(view.scan()) == make_records(NUM_WRITES)
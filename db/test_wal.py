@@ -0,0 +1,128 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from blocked_file import BlockedFile
+from blocked_file_wal import BlockedFileWAL
+from file_backed import FileBacked
+from file_backed_wal import FileBackedWAL
+from record import Experiment
+from wal import WriteAheadLog
+
+TEST_DIR = "/test"
+LOG_FILE = {
+    FileBackedWAL: Path("/test.db.wal"),
+    BlockedFileWAL: Path(f"{TEST_DIR}.wal"),
+}
+PATH = {
+    FileBackedWAL: "/test.db",
+    BlockedFileWAL: TEST_DIR,
+}
+PLAIN = {
+    FileBackedWAL: FileBacked,
+    BlockedFileWAL: BlockedFile,
+}
+
+@pytest.fixture(params=[FileBackedWAL, BlockedFileWAL])
+def db_cls(request, fs):
+    Path(TEST_DIR).mkdir()
+    return request.param
+
+def make(cls, **options):
+    return cls(Experiment, PATH[cls], **options)
+
+def logged(cls):
+    with open(LOG_FILE[cls], "r") as reader:
+        entry = WriteAheadLog.SEQ_WIDTH + Experiment.size()
+        return len(reader.read()) // entry
+
+def test_wal_add_then_get(db_cls):
+    db = make(db_cls)
+    ex = Experiment("ex01", 12345, [1, 2])
+    db.add(ex)
+    assert db.get("ex01") == ex
+    db.close()
+
+def test_wal_commits_in_batches(db_cls, make_records):
+    db = make(db_cls, batch_size=3, interval=60)
+    records = make_records(3)
+    db.add(records[0])
+    db.add(records[1])
+    assert logged(db_cls) == 0
+    db.add(records[2])
+    assert logged(db_cls) == 3
+    db.close()
+
+def test_wal_commits_after_interval(db_cls):
+    db = make(db_cls, batch_size=100, interval=0.01)
+    db.add(Experiment("ex01", 12345, [1, 2]))
+    deadline = time.time() + 5
+    while (logged(db_cls) == 0) and (time.time() < deadline):
+        time.sleep(0.01)
+    assert logged(db_cls) == 1
+    db.close()
+
+def test_wal_checkpoints_in_background(db_cls, make_records):
+    db = make(db_cls, batch_size=1, checkpoint_size=4)
+    records = make_records(10)
+    for r in records:
+        db.add(r)
+    db._wal._wait_for_checkpoint()
+    assert logged(db_cls) < len(records)
+    db.close()
+    assert not LOG_FILE[db_cls].exists()
+    plain = PLAIN[db_cls](Experiment, PATH[db_cls])
+    assert all(plain.get(Experiment.key(r)) == r for r in records)
+
+def test_wal_recovers_after_crash(db_cls, make_records):
+    records = make_records(5)
+    first = make(db_cls, batch_size=100, interval=60)
+    for r in records:
+        first.add(r)
+    first.sync()
+    with open(LOG_FILE[db_cls], "a") as writer:
+        writer.write(Experiment.pack(records[0])[:5])  # torn write
+
+    second = make(db_cls)
+    assert all(second.get(Experiment.key(r)) == r for r in records)
+    second.close()
+    plain = PLAIN[db_cls](Experiment, PATH[db_cls])
+    assert all(plain.get(Experiment.key(r)) == r for r in records)
+
+def test_wal_recovers_overwrites_in_order(db_cls):
+    first = make(db_cls, batch_size=1)
+    first.add(Experiment("ex01", 1, [1]))
+    first.add(Experiment("ex01", 2, [2]))
+    second = make(db_cls)
+    assert second.get("ex01") == Experiment("ex01", 2, [2])
+    second.close()
+
+def test_wal_replay_is_idempotent(db_cls, make_records):
+    records = make_records(5)
+    first = make(db_cls, batch_size=1)
+    for r in records:
+        first.add(r)
+    saved = LOG_FILE[db_cls].read_text()
+    first.close()
+    # Crash after the checkpoint but before the log was deleted.
+    LOG_FILE[db_cls].write_text(saved)
+    second = make(db_cls)
+    assert all(second.get(Experiment.key(r)) == r for r in records)
+    second.close()
+    if db_cls is BlockedFileWAL:
+        plain = BlockedFile(Experiment, TEST_DIR)
+        assert plain.num_blocks() == first.num_blocks()
+        assert list(plain.scan()) == records
+
+def test_wal_foreground_checkpoint_waits_for_background(db_cls, make_records):
+    db = make(db_cls, batch_size=1, checkpoint_size=2)
+    records = make_records(6)
+    for r in records:
+        db.add(r)
+    db._wal.checkpoint()
+    assert db._wal._worker is None
+    assert logged(db_cls) == 0
+    db.close()
+    plain = PLAIN[db_cls](Experiment, PATH[db_cls])
+    assert all(plain.get(Experiment.key(r)) == r for r in records)
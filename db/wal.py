@@ -0,0 +1,169 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+class WriteAheadLog:
+    BATCH_SIZE = 32          # commit after this many records...
+    INTERVAL = 0.01          # ...or after this many seconds
+    CHECKPOINT_SIZE = 1024   # checkpoint when the log holds this many
+    SEQ_WIDTH = 10           # digits in the sequence ID logged with a record
+
+    def __init__(self, filename, record_cls, snapshot, checkpoint,
+                 batch_size=None, interval=None, checkpoint_size=None):
+        self._filename = Path(filename)
+        self._old_filename = Path(f"{filename}.old")
+        self._record_cls = record_cls
+        self._binary = getattr(record_cls, "BINARY", False)
+        self._snapshot = snapshot
+        self._checkpoint = checkpoint
+        self._batch_size = batch_size or self.BATCH_SIZE
+        self._interval = interval or self.INTERVAL
+        self._checkpoint_size = checkpoint_size or self.CHECKPOINT_SIZE
+        self.lock = threading.RLock()
+        self._pending = []
+        self._logged = 0
+        self._timer = None
+        self._worker = None
+
+    def recover(self, apply):
+        # Records are replayed with the sequence IDs they were logged with,
+        # so replaying a log whose changes were already saved is harmless.
+        replayed = 0
+        for filename in (self._old_filename, self._filename):
+            for (seq_id, record) in self._read_log(filename):
+                apply(seq_id, record)
+                replayed += 1
+        if replayed:
+            self._checkpoint(self._snapshot())
+        self._old_filename.unlink(missing_ok=True)
+        self._filename.unlink(missing_ok=True)
+        self._filename.touch()
+        return replayed
+
+    def append(self, record, seq_id=0):
+        with self.lock:
+            self._pending.append(self._pack(seq_id, record))
+            if len(self._pending) >= self._batch_size:
+                self._commit()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def sync(self):
+        with self.lock:
+            self._commit()
+
+    def checkpoint(self):
+        self._claim()
+        try:
+            self._checkpoint(self._snapshot())
+            self._filename.unlink()
+            self._filename.touch()
+            self._logged = 0
+        finally:
+            self.lock.release()
+
+    def close(self):
+        self._claim()
+        try:
+            if self._logged:
+                self._checkpoint(self._snapshot())
+            self._filename.unlink(missing_ok=True)
+        finally:
+            self.lock.release()
+
+    def _claim(self):
+        # Return holding the lock once no background checkpoint is running,
+        # so that another one can't start before the caller is done.
+        while True:
+            self.lock.acquire()
+            self._commit()
+            worker = self._worker
+            if worker is None:
+                return
+            self.lock.release()
+            worker.join()
+
+    def _on_timer(self):
+        with self.lock:
+            self._timer = None
+            self._commit()
+
+    def _commit(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        empty = b"" if self._binary else ""
+        with open(self._filename, self._mode("a")) as writer:
+            writer.write(empty.join(self._pending))
+            writer.flush()
+            os.fsync(writer.fileno())
+        self._logged += len(self._pending)
+        self._pending = []
+        if (self._logged >= self._checkpoint_size) and (self._worker is None):
+            self._start_checkpoint()
+
+    def _start_checkpoint(self):
+        # Everything in the current log is captured by the snapshot, so
+        # the log can be set aside and deleted once the snapshot is saved.
+        self._filename.replace(self._old_filename)
+        self._filename.touch()
+        self._logged = 0
+        snapshot = self._snapshot()
+        self._worker = threading.Thread(
+            target=self._run_checkpoint, args=(snapshot,), daemon=True
+        )
+        self._worker.start()
+
+    def _run_checkpoint(self, snapshot):
+        self._checkpoint(snapshot)
+        self._old_filename.unlink()
+        with self.lock:
+            self._worker = None
+
+    def _wait_for_checkpoint(self):
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def _pack(self, seq_id, record):
+        prefix = f"{seq_id:0{self.SEQ_WIDTH}}"
+        if self._binary:
+            prefix = prefix.encode()
+        return prefix + self._record_cls.pack(record)
+
+    def _read_log(self, filename):
+        if not filename.exists():
+            return []
+        with open(filename, self._mode("r")) as reader:
+            raw = reader.read()
+        size = self.SEQ_WIDTH + self._record_cls.size()
+        complete = len(raw) - (len(raw) % size)  # ignore a torn last write
+        return [
+            (
+                int(raw[i:i + self.SEQ_WIDTH]),
+                self._record_cls.unpack(raw[i + self.SEQ_WIDTH:i + size])
+            )
+            for i in range(0, complete, size)
+        ]
+
+    def _mode(self, mode):
+        return f"{mode}b" if self._binary else mode
+
+def replace_atomically(filename, data, mode="w"):
+    # Write to a temporary file with a name of its own beside the target
+    # and then move it into place, so a crash (or another checkpoint
+    # running at the same time) never leaves a half-written file.
+    filename = Path(filename)
+    fd, temp = tempfile.mkstemp(
+        dir=filename.parent, prefix=f".{filename.name}.", suffix=".tmp"
+    )
+    with os.fdopen(fd, mode) as writer:
+        writer.write(data)
+        writer.flush()
+        os.fsync(writer.fileno())
+    os.replace(temp, filename)
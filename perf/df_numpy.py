@@ -0,0 +1,125 @@
+import operator
+
+import numpy as np
+
+from df_base import DataFrame
+from util import all_eq
+
+class Expr:
+    def __init__(self, op, *operands):
+        self._op = op
+        self._operands = operands
+
+    def evaluate(self, data):
+        values = [
+            o.evaluate(data) if isinstance(o, Expr) else o
+            for o in self._operands
+        ]
+        return self._op(*values)
+
+    def __eq__(self, other):
+        return Expr(operator.eq, self, other)
+
+    def __ne__(self, other):
+        return Expr(operator.ne, self, other)
+
+    def __lt__(self, other):
+        return Expr(operator.lt, self, other)
+
+    def __le__(self, other):
+        return Expr(operator.le, self, other)
+
+    def __gt__(self, other):
+        return Expr(operator.gt, self, other)
+
+    def __ge__(self, other):
+        return Expr(operator.ge, self, other)
+
+    def __add__(self, other):
+        return Expr(operator.add, self, other)
+
+    def __sub__(self, other):
+        return Expr(operator.sub, self, other)
+
+    def __mul__(self, other):
+        return Expr(operator.mul, self, other)
+
+    def __mod__(self, other):
+        return Expr(operator.mod, self, other)
+
+    def __and__(self, other):
+        return Expr(operator.and_, self, other)
+
+    def __or__(self, other):
+        return Expr(operator.or_, self, other)
+
+    def __invert__(self):
+        return Expr(operator.invert, self)
+
+    __hash__ = None
+
+
+class Col(Expr):
+    def __init__(self, name):
+        super().__init__(None)
+        self._name = name
+
+    def evaluate(self, data):
+        assert self._name in data, f"unknown column {self._name}"
+        return data[self._name]
+
+
+class DfNumpy(DataFrame):
+    def __init__(self, **kwargs):
+        assert len(kwargs) > 0
+        data = {k: np.asarray(v) for (k, v) in kwargs.items()}
+        assert all(v.ndim == 1 for v in data.values())
+        assert all_eq(*(len(v) for v in data.values()))
+        self._data = data
+
+    def ncol(self):
+        return len(self._data)
+
+    def nrow(self):
+        n = next(iter(self._data))
+        return len(self._data[n])
+
+    def cols(self):
+        return set(self._data.keys())
+
+    def get(self, col, row):
+        assert col in self._data
+        assert 0 <= row < len(self._data[col])
+        return self._data[col][row].item()
+
+    def eq(self, other):
+        assert isinstance(other, DataFrame)
+        if self.cols() != other.cols() or self.nrow() != other.nrow():
+            return False
+        if isinstance(other, DfNumpy):
+            return all(
+                np.array_equal(self._data[n], other._data[n])
+                for n in self._data
+            )
+        return all(
+            self.get(n, i) == other.get(n, i)
+            for n in self._data for i in range(self.nrow())
+        )
+
+    def select(self, *names):
+        assert all(n in self._data for n in names)
+        return DfNumpy(**{n: self._data[n] for n in names})
+
+    def filter(self, func):
+        # Expressions and functions are applied to whole columns at once,
+        # so func must work on arrays (e.g., "a % 2 == 1", not "if a...").
+        if isinstance(func, Expr):
+            mask = func.evaluate(self._data)
+        else:
+            mask = func(**self._data)
+        mask = np.asarray(mask)
+        assert (mask.dtype == bool) and (mask.shape == (self.nrow(),))
+        return DfNumpy(**{n: v[mask] for (n, v) in self._data.items()})
+
+    def __str__(self):
+        return str(self._data)
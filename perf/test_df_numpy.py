@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from df_col import DfCol
+from df_numpy import Col, DfNumpy
+
+def test_construct_with_single_value():
+    df = DfNumpy(a=[1])
+    assert df.get("a", 0) == 1
+
+def test_construct_with_two_pairs():
+    df = DfNumpy(a=[1, 2], b=[3, 4])
+    assert df.get("a", 0) == 1
+    assert df.get("a", 1) == 2
+    assert df.get("b", 0) == 3
+    assert df.get("b", 1) == 4
+
+def test_construct_with_unequal_lengths():
+    with pytest.raises(AssertionError):
+        DfNumpy(a=[1, 2], b=[3])
+
+def test_nrow():
+    assert DfNumpy(a=[1, 2], b=[3, 4]).nrow() == 2
+
+def test_ncol():
+    assert DfNumpy(a=[1, 2], b=[3, 4]).ncol() == 2
+
+def test_equality():
+    left = DfNumpy(a=[1, 2], b=[3, 4])
+    right = DfNumpy(b=[3, 4], a=[1, 2])
+    assert left.eq(right) and right.eq(left)
+
+def test_inequality():
+    left = DfNumpy(a=[1, 2], b=[3, 4])
+    assert not left.eq(DfNumpy(a=[1, 2]))
+    assert not left.eq(DfNumpy(a=[1, 2], b=[1, 2]))
+
+def test_equality_with_other_layouts():
+    assert DfNumpy(a=[1, 2], b=[3, 4]).eq(DfCol(a=[1, 2], b=[3, 4]))
+    assert DfCol(a=[1, 2], b=[3, 4]).eq(DfNumpy(a=[1, 2], b=[3, 4]))
+
+def test_select_does_not_copy():
+    df = DfNumpy(a=[1, 2], b=[3, 4])
+    selected = df.select("a")
+    assert selected.eq(DfNumpy(a=[1, 2]))
+    assert np.shares_memory(selected._data["a"], df._data["a"])
+
+def test_filter_with_expression():
+    df = DfNumpy(a=[1, 2, 3], b=[3, 4, 5])
+    assert df.filter(Col("a") % 2 == 1).eq(DfNumpy(a=[1, 3], b=[3, 5]))
+
+def test_filter_combines_expressions():
+    df = DfNumpy(a=[1, 2, 3], b=[3, 4, 5])
+    expr = (Col("a") > 1) & ~(Col("b") == 5)
+    assert df.filter(expr).eq(DfNumpy(a=[2], b=[4]))
+
+def test_filter_with_vectorized_function():
+    def odd(a, b):
+        return (a % 2) == 1
+
+    df = DfNumpy(a=[1, 2], b=[3, 4])
+    assert df.filter(odd).eq(DfNumpy(a=[1], b=[3]))
+
+def test_filter_requires_boolean_mask():
+    df = DfNumpy(a=[1, 2], b=[3, 4])
+    with pytest.raises(AssertionError):
+        df.filter(Col("a") + 1)
+    with pytest.raises(AssertionError):
+        df.filter(Col("c") == 1)
@@ -3,6 +3,7 @@ import sys
 import time
 
 from df_col import DfCol
+from df_numpy import Col, DfNumpy
 from df_row import DfRow
 
 # mccole:create
@@ -24,6 +25,10 @@ def make_row(nrow, ncol):
     return DfRow(fill)
 # mccole:/create
 
+def make_numpy(nrow, ncol):
+    fill = make_col(nrow, ncol)._data
+    return DfNumpy(**fill)
+
 # mccole:filter
 FILTER = 2
 
@@ -35,6 +40,12 @@ def time_filter(df):
     return time.time() - start
 # mccole:/filter
 
+def time_filter_expr(df):
+    expr = (Col("label_0") % FILTER) == 1
+    start = time.time()
+    df.filter(expr)
+    return time.time() - start
+
 # mccole:select
 SELECT = 3
 
@@ -52,11 +63,14 @@ def sweep(sizes):
     for (nrow, ncol) in sizes:
         df_col = make_col(nrow, ncol)
         df_row = make_row(nrow, ncol)
+        df_numpy = make_numpy(nrow, ncol)
         times = [
             time_filter(df_col),
             time_select(df_col),
             time_filter(df_row),
             time_select(df_row),
+            time_filter_expr(df_numpy),
+            time_select(df_numpy),
         ]
         result.append([nrow, ncol, *times])
     return result
@@ -70,9 +84,12 @@ def setup(spec):
 
 def report(result):
     writer = csv.writer(sys.stdout)
-    writer.writerow(
-        ["nrow", "ncol", "filter_col", "select_col", "filter_row", "select_row"]
-    )
+    writer.writerow([
+        "nrow", "ncol",
+        "filter_col", "select_col",
+        "filter_row", "select_row",
+        "filter_numpy", "select_numpy",
+    ])
     for row in result:
         writer.writerow(row)
 